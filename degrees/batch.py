@@ -0,0 +1,98 @@
+import csv
+import json
+import sys
+
+import degrees
+from degrees import graph
+
+
+def main():
+    """
+    Usage: python batch.py directory [pairs.csv]
+
+    Prints one JSON result per pair, read from pairs.csv or standard
+    input. Results are not in input order: see `answer_pairs`.
+    """
+    if len(sys.argv) not in (2, 3):
+        sys.exit("Usage: python batch.py directory [pairs.csv]")
+    directory = sys.argv[1]
+
+    degrees.load_data(directory)
+
+    if len(sys.argv) == 3:
+        with open(sys.argv[2], encoding="utf-8") as f:
+            pairs = read_pairs(f)
+    else:
+        pairs = read_pairs(sys.stdin)
+
+    for result in answer_pairs(pairs):
+        print(json.dumps(result), flush=True)
+
+
+def read_pairs(f):
+    """
+    Reads (source, target) pairs from CSV rows. Each field may be an
+    IMDb person id or a name; blank lines and extra fields are ignored.
+    """
+    return [(row[0].strip(), row[1].strip()) for row in csv.reader(f) if len(row) >= 2]
+
+
+def resolve(person):
+    """
+    Returns (person index, None) for an IMDb id or an unambiguous name,
+    otherwise (None, error) where error is a dict explaining why:
+    "person not found", or "ambiguous name" with the IMDb ids of
+    everyone of that name, most prolific first.
+    """
+    if person in graph.person_index:
+        return graph.person_index[person], None
+    matches = graph.names.get(person.lower(), [])
+    if len(matches) == 1:
+        return matches[0], None
+    if not matches:
+        return None, {"error": "person not found", "person": person}
+    matches = sorted(matches, key=graph.movie_count, reverse=True)
+    return None, {
+        "error": "ambiguous name", "person": person,
+        "candidates": [graph.person_ids[match] for match in matches],
+    }
+
+
+def answer_pairs(pairs):
+    """
+    Yields one result dict per pair. Pairs are grouped by source person
+    and answered from a single BFS tree per source, so results do not
+    come out in input order: first an error result for every pair
+    naming a person who is not found or whose name is ambiguous, as it
+    is read, then the answered pairs grouped by source in order of
+    first appearance of each source.
+    """
+    groups = {}
+    for source, target in pairs:
+        source_index, error = resolve(source)
+        if error is None:
+            target_index, error = resolve(target)
+        if error is not None:
+            yield {"source": source, "target": target, **error}
+            continue
+        groups.setdefault(source_index, []).append((source, target, target_index))
+
+    for source_index, group in groups.items():
+        parents = degrees.bfs_tree(source_index, [target for _, _, target in group])
+        for source, target, target_index in group:
+            result = {"source": source, "target": target}
+            path = degrees.path_in_tree(parents, target_index)
+            if path is None:
+                result["degrees"] = None
+                result["path"] = None
+            else:
+                result["degrees"] = len(path)
+                result["path"] = [
+                    [graph.movie_ids[movie], graph.person_ids[person]]
+                    for movie, person in path
+                ]
+            yield result
+
+
+if __name__ == "__main__":
+    main()
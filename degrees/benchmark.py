@@ -0,0 +1,207 @@
+import random
+import sys
+import time
+import tracemalloc
+
+import degrees
+from graph import Graph
+from landmarks import Landmarks
+from util import Node, StackFrontier, QueueFrontier
+
+
+def main():
+    """
+    Usage: python benchmark.py [directory] [pairs] [search ...]
+           python benchmark.py frontiers
+    """
+    if sys.argv[1:] == ["frontiers"]:
+        benchmark_frontiers()
+        return
+    directory = sys.argv[1] if len(sys.argv) >= 2 else "large"
+    pairs = int(sys.argv[2]) if len(sys.argv) >= 3 else 20
+    searches = sys.argv[3:] or None
+    if searches and any(search not in degrees.SEARCHES for search in searches):
+        sys.exit(f"Searches must be among: {', '.join(degrees.SEARCHES)}")
+
+    report_memory(directory)
+    pairs = random_pairs(pairs)
+    report_names()
+    if searches is None or "alt" in searches:
+        report_landmarks(pairs)
+    compare_searches(pairs, searches)
+
+
+def report_memory(directory):
+    """
+    Loads `directory` and reports load times (from CSV and from the
+    binary snapshot) and memory used by the graph store.
+    """
+    start = time.perf_counter()
+    Graph().load(directory, use_snapshot=False)
+    csv_time = time.perf_counter() - start
+
+    # Make sure the snapshot is current before timing a load from it
+    Graph().load(directory)
+    start = time.perf_counter()
+    degrees.load_data(directory)
+    snapshot_time = time.perf_counter() - start
+
+    # Load a second copy under tracemalloc, which would skew the timing
+    tracemalloc.start()
+    graph = Graph()
+    graph.load(directory, use_snapshot=False)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"Dataset: {directory}")
+    print(f"  People: {graph.num_people}, Movies: {graph.num_movies}, Stars: {len(graph.person_movies)}")
+    print(f"  Load time: {csv_time:.3f}s from CSV, {snapshot_time:.3f}s from snapshot")
+    print(f"  Adjacency arrays: {graph.nbytes() / 2**20:.2f} MiB")
+    print(f"  Resident after load: {current / 2**20:.2f} MiB (peak {peak / 2**20:.2f} MiB)")
+
+
+def report_names(samples=1000, seed=0):
+    """
+    Reports mean latency of exact, prefix and fuzzy name lookups for
+    names sampled from the whole people table.
+    """
+    graph = degrees.graph
+    rng = random.Random(seed)
+    names = [
+        graph.person_names[rng.randrange(graph.num_people)].lower()
+        for _ in range(min(samples, graph.num_people))
+    ]
+
+    start = time.perf_counter()
+    graph.complete("")
+    print(f"Name lookups ({len(names)} samples, ranking built in {time.perf_counter() - start:.3f}s):")
+    lookups = [
+        ("exact", lambda name: graph.names.get(name)),
+        ("prefix", lambda name: graph.complete(name[:3])),
+        ("fuzzy (1 edit)", lambda name: graph.fuzzy(name[:-1], max_distance=1)),
+        ("fuzzy (2 edits)", lambda name: graph.fuzzy(name[1:] + "x", max_distance=2)),
+    ]
+    for label, lookup in lookups:
+        start = time.perf_counter()
+        for name in names:
+            lookup(name)
+        elapsed = time.perf_counter() - start
+        print(f"  {label:>15}: {elapsed * 1e6 / max(len(names), 1):10.1f}us per lookup")
+
+
+def report_landmarks(pairs, count=32):
+    """
+    Builds a landmark index for the loaded graph and reports its build
+    time, size and the cost of bounding separation for `pairs`.
+    """
+    graph = degrees.graph
+    start = time.perf_counter()
+    degrees.landmarks = Landmarks.build(graph, count)
+    elapsed = time.perf_counter() - start
+    print(f"Landmarks: {count} built in {elapsed:.3f}s, {degrees.landmarks.nbytes() / 2**20:.2f} MiB")
+
+    start = time.perf_counter()
+    for source, target in pairs:
+        degrees.landmarks.bounds(graph.person_index[source], graph.person_index[target])
+    elapsed = time.perf_counter() - start
+    print(f"  Bounds for {len(pairs)} pairs: {elapsed * 1e6 / max(len(pairs), 1):.1f}us per pair")
+
+
+class ListQueueFrontier():
+    """
+    The original list-backed frontier, kept as a baseline: linear
+    membership scans and a full list copy on every removal.
+    """
+    def __init__(self):
+        self.frontier = []
+
+    def add(self, node):
+        self.frontier.append(node)
+
+    def contains_state(self, state):
+        return any(node.state == state for node in self.frontier)
+
+    def empty(self):
+        return len(self.frontier) == 0
+
+    def remove(self):
+        node = self.frontier[0]
+        self.frontier = self.frontier[1:]
+        return node
+
+
+def benchmark_frontiers(sizes=(10**4, 10**5, 10**6), baseline_limit=10**5, probes=1000):
+    """
+    Times filling a frontier with `size` nodes, `probes` membership
+    tests and draining it again, for each frontier class.
+    """
+    print("Frontier microbenchmark (add all, probe, remove all):")
+    frontiers = [ListQueueFrontier, StackFrontier, QueueFrontier]
+    for size in sizes:
+        for frontier_class in frontiers:
+            if frontier_class is ListQueueFrontier and size > baseline_limit:
+                continue
+            frontier = frontier_class()
+            start = time.perf_counter()
+            for state in range(size):
+                frontier.add(Node(state, None, None))
+            for state in range(0, 2 * size, 2 * size // probes):
+                frontier.contains_state(state)
+            while not frontier.empty():
+                frontier.remove()
+            elapsed = time.perf_counter() - start
+            print(f"  {frontier_class.__name__:>17} n={size:<8}: {elapsed:8.3f}s")
+
+
+def random_pairs(n, seed=0):
+    """
+    Returns `n` random (source, target) pairs of people who have starred in something.
+    """
+    rng = random.Random(seed)
+    graph = degrees.graph
+    actors = [
+        person for person in range(graph.num_people)
+        if graph.person_offsets[person] != graph.person_offsets[person + 1]
+    ]
+    return [
+        (graph.person_ids[rng.choice(actors)], graph.person_ids[rng.choice(actors)])
+        for _ in range(n)
+    ]
+
+
+def compare_searches(pairs, searches=None):
+    """
+    Runs each search engine over the same pairs and reports
+    total nodes expanded, nodes generated and wall time.
+
+    The "frontier" search has no explored set and never finishes on a
+    disconnected pair, so it is left out unless asked for, and then
+    only run on pairs that "bfs" finds connected.
+    """
+    searches = searches or [search for search in degrees.SEARCHES if search != "frontier"]
+    if "frontier" in searches:
+        connected = [degrees.shortest_path(source, target, search="bfs") is not None for source, target in pairs]
+    print(f"Searches over {len(pairs)} random pairs:")
+    lengths = {}
+    for search in searches:
+        expanded = generated = 0
+        found = []
+        start = time.perf_counter()
+        for i, (source, target) in enumerate(pairs):
+            if search == "frontier" and not connected[i]:
+                found.append(None)
+                continue
+            path = degrees.shortest_path(source, target, search=search)
+            expanded += degrees.stats["expanded"]
+            generated += degrees.stats["generated"]
+            found.append(None if path is None else len(path))
+        elapsed = time.perf_counter() - start
+        lengths[search] = found
+        print(f"  {search:>14}: {elapsed:8.3f}s, expanded {expanded}, generated {generated}")
+
+    if any(found != lengths[searches[0]] for found in lengths.values()):
+        print("  WARNING: searches disagree on path lengths")
+
+
+if __name__ == "__main__":
+    main()
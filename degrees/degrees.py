@@ -1,66 +1,47 @@
-import csv
+import heapq
 import sys
+from collections import deque
 
+from graph import Graph
+from landmarks import Landmarks
 from util import Node, StackFrontier, QueueFrontier
 
-# Maps names to a set of corresponding person_ids
-names = {}
+# Integer-indexed store of people, movies and who starred in what
+graph = Graph()
 
-# Maps person_ids to a dictionary of: name, birth, movies (a set of movie_ids)
-people = {}
+# Optional landmark distance index, needed by the "alt" search
+landmarks = None
 
-# Maps movie_ids to a dictionary of: title, year, stars (a set of person_ids)
-movies = {}
+# Counters from the most recent search
+stats = {"expanded": 0, "generated": 0}
 
 
 def load_data(directory):
     """
-    Load data from CSV files into memory.
-    """
-    # Load people
-    with open(f"{directory}/people.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            people[row["id"]] = {
-                "name": row["name"],
-                "birth": row["birth"],
-                "movies": set()
-            }
-            if row["name"].lower() not in names:
-                names[row["name"].lower()] = {row["id"]}
-            else:
-                names[row["name"].lower()].add(row["id"])
-
-    # Load movies
-    with open(f"{directory}/movies.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            movies[row["id"]] = {
-                "title": row["title"],
-                "year": row["year"],
-                "stars": set()
-            }
-
-    # Load stars
-    with open(f"{directory}/stars.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            try:
-                people[row["person_id"]]["movies"].add(row["movie_id"])
-                movies[row["movie_id"]]["stars"].add(row["person_id"])
-            except KeyError:
-                pass
+    Load data from CSV files into memory, going through a binary
+    snapshot in the same directory that is rebuilt when the CSVs change.
+    Also loads the landmark index written by landmarks.py, if there is
+    one up to date with the CSVs.
+    """
+    global landmarks
+    graph.load(directory)
+    landmarks = Landmarks.load(directory)
+    if landmarks is not None and landmarks.num_people != graph.num_people:
+        landmarks = None
 
 
 def main():
-    if len(sys.argv) > 2:
-        sys.exit("Usage: python degrees.py [directory]")
-    directory = sys.argv[1] if len(sys.argv) == 2 else "large"
+    if len(sys.argv) > 3:
+        sys.exit("Usage: python degrees.py [directory] [search]")
+    directory = sys.argv[1] if len(sys.argv) >= 2 else "large"
+    search = sys.argv[2] if len(sys.argv) == 3 else "bidirectional"
+    if search not in SEARCHES:
+        sys.exit(f"Search must be one of: {', '.join(SEARCHES)}")
 
     # Load data from files into memory
     print("Loading data...")
     load_data(directory)
-    print("Data loaded.")
+    print("Data loaded." if landmarks is None else "Data and landmark index loaded.")
 
     source = person_id_for_name(input("Name: "))
     if source is None:
@@ -69,7 +50,9 @@ def main():
     if target is None:
         sys.exit("Person not found.")
 
-    path = shortest_path(source, target)
+    if search == "alt" and landmarks is None:
+        sys.exit("The alt search needs a landmark index: run landmarks.py first.")
+    path = shortest_path(source, target, search)
 
     if path is None:
         print("Not connected.")
@@ -78,19 +61,41 @@ def main():
         print(f"{degrees} degrees of separation.")
         path = [(None, source)] + path
         for i in range(degrees):
-            person1 = people[path[i][1]]["name"]
-            person2 = people[path[i + 1][1]]["name"]
-            movie = movies[path[i + 1][0]]["title"]
+            person1 = graph.person_names[graph.person_index[path[i][1]]]
+            person2 = graph.person_names[graph.person_index[path[i + 1][1]]]
+            movie = graph.movie_titles[graph.movie_index[path[i + 1][0]]]
             print(f"{i + 1}: {person1} and {person2} starred in {movie}")
 
 
-def shortest_path(source, target):
+def shortest_path(source, target, search="bidirectional"):
     """
     Returns the shortest list of (movie_id, person_id) pairs
     that connect the source to the target.
 
+    `search` selects the engine: "bfs" (BFS with an explored set and
+    goal test on generation), "frontier" (the original BFS that tests
+    only the frontier), "bidirectional" or "alt" (A* guided by the
+    landmark index, which must be loaded into `landmarks` first).
+    "bidirectional" is the default: it is much faster than "alt" even
+    when a landmark index is loaded, so "alt" must be asked for.
+
     If no possible path, returns None.
     """
+    path = SEARCHES[search](graph.person_index[source], graph.person_index[target])
+    if path is None:
+        return None
+    return [
+        (graph.movie_ids[movie], graph.person_ids[person])
+        for movie, person in path
+    ]
+
+
+def frontier_search(source, target):
+    """
+    Breadth-first search over person indices using a QueueFrontier.
+    Returns a list of (movie, person) index pairs, or None.
+    """
+    stats["expanded"] = stats["generated"] = 0
     start = Node(source,None,None)
     
     frontier = QueueFrontier()
@@ -102,6 +107,7 @@ def shortest_path(source, target):
         if frontier.empty():
             return None
         node = frontier.remove()
+        stats["expanded"] += 1
         
         if node.state == target:   
             while node.parent:
@@ -109,26 +115,227 @@ def shortest_path(source, target):
                 node = node.parent
             return path[::-1]
          
-        for neighbor in neighbors_for_person(node.state):
+        for neighbor in graph.neighbors(node.state):
             if node.state != neighbor[1] and not frontier.contains_state(neighbor[1]):
                 new_node = Node(neighbor[1],node,neighbor)
                 frontier.add(new_node)
-    
+                stats["generated"] += 1
+
+
+def bfs_search(source, target):
+    """
+    Breadth-first search that marks people as explored and tests for
+    the goal as soon as a neighbor is generated.
+    Returns a list of (movie, person) index pairs, or None.
+    """
+    stats["expanded"] = stats["generated"] = 0
+    if source == target:
+        return []
+
+    frontier = QueueFrontier()
+    frontier.add(Node(source, None, None))
+    explored = {source}
+
+    while not frontier.empty():
+        node = frontier.remove()
+        stats["expanded"] += 1
+
+        for movie, person in graph.neighbors(node.state):
+            if person in explored:
+                continue
+            explored.add(person)
+            child = Node(person, node, (movie, person))
+            stats["generated"] += 1
+
+            if person == target:
+                path = []
+                while child.parent is not None:
+                    path.append(child.action)
+                    child = child.parent
+                return path[::-1]
+
+            frontier.add(child)
+
+    return None
+
+
+def bidirectional_search(source, target):
+    """
+    Breadth-first search expanding from both source and target, one full
+    level at a time on whichever side has the smaller frontier.
+    Returns a list of (movie, person) index pairs, or None.
+    """
+    stats["expanded"] = stats["generated"] = 0
+    if source == target:
+        return []
+
+    # Maps person -> (previous person towards that side's root, movie)
+    forward = {source: None}
+    backward = {target: None}
+    forward_frontier = [source]
+    backward_frontier = [target]
+
+    while forward_frontier and backward_frontier:
+        if len(forward_frontier) <= len(backward_frontier):
+            frontier, parents, others = forward_frontier, forward, backward
+        else:
+            frontier, parents, others = backward_frontier, backward, forward
+
+        # Expand a whole level so the first meeting found is a shortest one
+        meeting = None
+        next_frontier = []
+        for person in frontier:
+            stats["expanded"] += 1
+            for movie, neighbor in graph.neighbors(person):
+                if neighbor in parents:
+                    continue
+                parents[neighbor] = (person, movie)
+                next_frontier.append(neighbor)
+                stats["generated"] += 1
+                if meeting is None and neighbor in others:
+                    meeting = neighbor
+            if meeting is not None:
+                break
+        if meeting is not None:
+            return join_paths(forward, backward, meeting)
+
+        if parents is forward:
+            forward_frontier = next_frontier
+        else:
+            backward_frontier = next_frontier
+
+    return None
+
+
+def join_paths(forward, backward, meeting):
+    """
+    Builds the source-to-target path through `meeting` from the parent
+    maps of a bidirectional search.
+    """
+    path = []
+    person = meeting
+    while forward[person] is not None:
+        previous, movie = forward[person]
+        path.append((movie, person))
+        person = previous
+    path.reverse()
+
+    person = meeting
+    while backward[person] is not None:
+        following, movie = backward[person]
+        path.append((movie, following))
+        person = following
+    return path
+
+
+def alt_search(source, target):
+    """
+    A* search using landmark distances as an admissible heuristic.
+    Returns a list of (movie, person) index pairs, or None.
+    """
+    if landmarks is None:
+        raise Exception("alt search needs a landmark index")
+    stats["expanded"] = stats["generated"] = 0
+    lower, _ = landmarks.bounds(source, target)
+    if lower is None:
+        return None
+
+    estimate = landmarks.heuristic(target, source)
+    parents = {source: None}
+    cost = {source: 0}
+    # Ties on f = g + h go to the deepest node, which is closest to the goal
+    frontier = [(estimate(source), 0, source)]
+    closed = set()
+
+    while frontier:
+        _, depth, person = heapq.heappop(frontier)
+        distance = -depth
+        if person in closed:
+            continue
+        if person == target:
+            return path_in_tree(parents, target)
+        closed.add(person)
+        stats["expanded"] += 1
+
+        for movie, neighbor in graph.neighbors(person):
+            if neighbor in closed or cost.get(neighbor, distance + 2) <= distance + 1:
+                continue
+            cost[neighbor] = distance + 1
+            parents[neighbor] = (person, movie)
+            heapq.heappush(frontier, (distance + 1 + estimate(neighbor), -distance - 1, neighbor))
+            stats["generated"] += 1
+
+    return None
+
+
+def bfs_tree(source, targets=None):
+    """
+    Breadth-first search from `source` that records every person reached,
+    stopping early once all people in `targets` (if given) are reached.
+    Returns a dict mapping person -> (parent person, movie), with the
+    source mapped to None.
+    """
+    parents = {source: None}
+    remaining = set(targets) - {source} if targets is not None else None
+    if remaining is not None and not remaining:
+        return parents
+
+    queue = deque([source])
+    while queue:
+        person = queue.popleft()
+        for movie, neighbor in graph.neighbors(person):
+            if neighbor in parents:
+                continue
+            parents[neighbor] = (person, movie)
+            queue.append(neighbor)
+            if remaining is not None:
+                remaining.discard(neighbor)
+                if not remaining:
+                    return parents
+    return parents
+
+
+def path_in_tree(parents, target):
+    """
+    Returns the list of (movie, person) index pairs leading from the
+    root of a `bfs_tree` to `target`, or None if it was not reached.
+    """
+    if target not in parents:
+        return None
+    path = []
+    while parents[target] is not None:
+        person, movie = parents[target]
+        path.append((movie, target))
+        target = person
+    return path[::-1]
+
+
+SEARCHES = {
+    "bfs": bfs_search,
+    "frontier": frontier_search,
+    "bidirectional": bidirectional_search,
+    "alt": alt_search,
+}
+
 
 def person_id_for_name(name):
     """
     Returns the IMDB id for a person's name,
     resolving ambiguities as needed.
     """
-    person_ids = list(names.get(name.lower(), set()))
+    matches = sorted(graph.names.get(name.lower(), []), key=graph.movie_count, reverse=True)
+    person_ids = [graph.person_ids[i] for i in matches]
     if len(person_ids) == 0:
+        suggestions = graph.fuzzy(name, max_distance=2, limit=5)
+        if suggestions:
+            print("Did you mean: " + ", ".join(graph.person_names[i] for i in suggestions) + "?")
         return None
     elif len(person_ids) > 1:
         print(f"Which '{name}'?")
         for person_id in person_ids:
-            person = people[person_id]
-            name = person["name"]
-            birth = person["birth"]
+            index = graph.person_index[person_id]
+            name = graph.person_names[index]
+            birth = graph.person_births[index]
             print(f"ID: {person_id}, Name: {name}, Birth: {birth}")
         try:
             person_id = input("Intended Person ID: ")
@@ -146,12 +353,10 @@ def neighbors_for_person(person_id):
     Returns (movie_id, person_id) pairs for people
     who starred with a given person.
     """
-    movie_ids = people[person_id]["movies"]
-    neighbors = set()
-    for movie_id in movie_ids:
-        for person_id in movies[movie_id]["stars"]:
-            neighbors.add((movie_id, person_id))
-    return neighbors
+    return {
+        (graph.movie_ids[movie], graph.person_ids[person])
+        for movie, person in graph.neighbors(graph.person_index[person_id])
+    }
 
 
 if __name__ == "__main__":
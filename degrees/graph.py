@@ -0,0 +1,487 @@
+import bisect
+import csv
+import heapq
+import mmap
+import os
+import struct
+from array import array
+
+# Snapshot file written next to the CSVs, and the sources it is derived from
+SNAPSHOT = "graph.snapshot"
+SNAPSHOT_MAGIC = b"DEGRSNAP"
+SNAPSHOT_VERSION = 1
+SOURCES = ("people.csv", "movies.csv", "stars.csv")
+
+# Sorts after any character that can appear in a name, for prefix ranges
+LAST_CHARACTER = "\U0010ffff"
+
+# Sections stored in a snapshot, in order; the first six are int32 arrays
+ARRAY_SECTIONS = (
+    "person_offsets", "person_movies", "movie_offsets", "movie_stars",
+    "name_offsets", "name_people",
+)
+TEXT_SECTIONS = (
+    "person_ids", "person_names", "person_births",
+    "movie_ids", "movie_titles", "movie_years", "name_keys",
+)
+
+
+class NameIndex():
+    """
+    Maps lowercase names to person indices using a sorted list of names
+    and CSR arrays: the people called `keys[k]` are
+    `people[offsets[k]:offsets[k + 1]]`.
+    """
+
+    def __init__(self, keys, offsets, people):
+        self.keys = keys
+        self.offsets = offsets
+        self.people = people
+
+    @classmethod
+    def from_names(cls, names):
+        """Builds an index from a list of names, one per person index."""
+        groups = {}
+        for person, name in enumerate(names):
+            groups.setdefault(name.lower(), []).append(person)
+        keys = sorted(groups)
+        offsets = array("i", [0])
+        people = array("i")
+        for key in keys:
+            people.extend(groups[key])
+            offsets.append(len(people))
+        return cls(keys, offsets, people)
+
+    def get(self, name, default=None):
+        """Returns the person indices with lowercase name `name`."""
+        k = bisect.bisect_left(self.keys, name)
+        if k == len(self.keys) or self.keys[k] != name:
+            return default
+        return self.people_at(k)
+
+    def people_at(self, k):
+        """Returns the person indices for the key at position `k`."""
+        return list(self.people[self.offsets[k]:self.offsets[k + 1]])
+
+    def prefixed(self, prefix):
+        """Returns the range of key positions starting with `prefix`."""
+        start = bisect.bisect_left(self.keys, prefix)
+        end = bisect.bisect_left(self.keys, prefix + LAST_CHARACTER, start)
+        return range(start, end)
+
+    def within(self, name, max_distance):
+        """
+        Returns (distance, key position) pairs for keys within Levenshtein
+        distance `max_distance` of `name`.
+
+        The sorted keys are walked as an implicit trie: consecutive keys
+        share the dynamic programming rows of their common prefix, and
+        a prefix whose best row entry already exceeds `max_distance`
+        is skipped with a bisect past every key that starts with it.
+        """
+        keys = self.keys
+        cap = max_distance + 1
+        rows = [[min(j, cap) for j in range(len(name) + 1)]]
+        matches = []
+        previous = ""
+        k = 0
+        while k < len(keys):
+            key = keys[k]
+            common = 0
+            limit = min(len(previous), len(key), len(rows) - 1)
+            while common < limit and previous[common] == key[common]:
+                common += 1
+            del rows[common + 1:]
+
+            pruned = False
+            for i in range(common, len(key)):
+                above = rows[-1]
+                row = [cap] * (len(name) + 1)
+                row[0] = min(i + 1, cap)
+                # Only cells within `max_distance` of the diagonal can stay below the cap
+                for j in range(max(1, i + 1 - max_distance), min(len(name), i + 1 + max_distance) + 1):
+                    row[j] = min(
+                        row[j - 1] + 1,
+                        above[j] + 1,
+                        above[j - 1] + (name[j - 1] != key[i]),
+                        cap,
+                    )
+                rows.append(row)
+                if min(row) > max_distance:
+                    previous = key[:i + 1]
+                    k = bisect.bisect_left(keys, previous + LAST_CHARACTER, k)
+                    pruned = True
+                    break
+            if pruned:
+                continue
+
+            if rows[-1][-1] <= max_distance:
+                matches.append((rows[-1][-1], k))
+            previous = key
+            k += 1
+        return matches
+
+
+class RangeMax():
+    """
+    Segment tree over `values` that finds the position of the largest
+    value in a range, so ranges can be visited in descending order.
+    """
+
+    def __init__(self, values):
+        self.values = values
+        n = self.size = len(values)
+        tree = array("i", bytes(4 * 2 * n))
+        for i in range(n):
+            tree[n + i] = i
+        for i in range(n - 1, 0, -1):
+            tree[i] = self.better(tree[2 * i], tree[2 * i + 1])
+        self.tree = tree
+
+    def better(self, a, b):
+        """Returns whichever position holds the larger value, or the earlier on ties."""
+        if a < 0:
+            return b
+        if self.values[b] > self.values[a] or (self.values[b] == self.values[a] and b < a):
+            return b
+        return a
+
+    def argmax(self, lo, hi):
+        """Returns the position of the largest value in [lo, hi), or -1 if empty."""
+        best = -1
+        lo += self.size
+        hi += self.size
+        while lo < hi:
+            if lo & 1:
+                best = self.better(best, self.tree[lo])
+                lo += 1
+            if hi & 1:
+                hi -= 1
+                best = self.better(best, self.tree[hi])
+            lo //= 2
+            hi //= 2
+        return best
+
+    def descending(self, lo, hi):
+        """Yields the positions in [lo, hi) from largest value to smallest."""
+        heap = []
+
+        def push(lo, hi):
+            if lo < hi:
+                best = self.argmax(lo, hi)
+                heapq.heappush(heap, (-self.values[best], best, lo, hi))
+
+        push(lo, hi)
+        while heap:
+            _, best, lo, hi = heapq.heappop(heap)
+            yield best
+            push(lo, best)
+            push(best + 1, hi)
+
+
+class Graph():
+    """
+    Compact store for the people/movies graph.
+
+    People and movies are mapped to dense integer indices, and the
+    person -> movies and movie -> stars relations are kept as CSR-style
+    adjacency arrays: the movies of person `p` are
+    `person_movies[person_offsets[p]:person_offsets[p + 1]]`, and likewise
+    for the stars of a movie.
+    """
+
+    def __init__(self):
+        # Index -> IMDb id / attributes
+        self.person_ids = []
+        self.person_names = []
+        self.person_births = []
+        self.movie_ids = []
+        self.movie_titles = []
+        self.movie_years = []
+
+        # IMDb id -> index
+        self.person_index = {}
+        self.movie_index = {}
+
+        # Lowercase name -> person indices
+        self.names = NameIndex([], array("i", [0]), array("i"))
+
+        # CSR adjacency
+        self.person_offsets = array("i", [0])
+        self.person_movies = array("i")
+        self.movie_offsets = array("i", [0])
+        self.movie_stars = array("i")
+
+        # Memory map backing the arrays when loaded from a snapshot
+        self.snapshot = None
+
+        # Name keys ranked by their most prolific person, built on first use
+        self.name_ranking = None
+
+    @property
+    def num_people(self):
+        return len(self.person_offsets) - 1
+
+    @property
+    def num_movies(self):
+        return len(self.movie_offsets) - 1
+
+    def load(self, directory, use_snapshot=True):
+        """
+        Load the graph for `directory`, from its snapshot if that is
+        up to date with the CSVs, otherwise from the CSVs, writing a
+        fresh snapshot for next time.
+        """
+        if use_snapshot and self.load_snapshot(directory):
+            return
+        self.load_csv(directory)
+        if use_snapshot:
+            try:
+                self.write_snapshot(directory)
+            except OSError:
+                pass
+
+    def load_csv(self, directory):
+        """
+        Load people.csv, movies.csv and stars.csv from `directory`.
+        """
+        with open(f"{directory}/people.csv", encoding="utf-8") as f:
+            reader = csv.DictReader(f)
+            for row in reader:
+                self.person_index[row["id"]] = len(self.person_ids)
+                self.person_ids.append(row["id"])
+                self.person_names.append(row["name"])
+                self.person_births.append(row["birth"])
+        self.names = NameIndex.from_names(self.person_names)
+
+        with open(f"{directory}/movies.csv", encoding="utf-8") as f:
+            reader = csv.DictReader(f)
+            for row in reader:
+                self.movie_index[row["id"]] = len(self.movie_ids)
+                self.movie_ids.append(row["id"])
+                self.movie_titles.append(row["title"])
+                self.movie_years.append(row["year"])
+
+        # Collect (person, movie) edges, skipping unknown ids and duplicates
+        edge_people = array("i")
+        edge_movies = array("i")
+        seen = set()
+        with open(f"{directory}/stars.csv", encoding="utf-8") as f:
+            reader = csv.DictReader(f)
+            for row in reader:
+                person = self.person_index.get(row["person_id"])
+                movie = self.movie_index.get(row["movie_id"])
+                if person is None or movie is None:
+                    continue
+                key = person * len(self.movie_ids) + movie
+                if key in seen:
+                    continue
+                seen.add(key)
+                edge_people.append(person)
+                edge_movies.append(movie)
+
+        self.person_offsets, self.person_movies = build_csr(
+            len(self.person_ids), edge_people, edge_movies
+        )
+        self.movie_offsets, self.movie_stars = build_csr(
+            len(self.movie_ids), edge_movies, edge_people
+        )
+
+    def write_snapshot(self, directory):
+        """
+        Write the graph to a versioned binary snapshot in `directory`,
+        stamped with the mtime and size of each source CSV.
+        """
+        sections = [bytes(getattr(self, name)) for name in ARRAY_SECTIONS[:4]]
+        sections += [bytes(self.names.offsets), bytes(self.names.people)]
+        for name in TEXT_SECTIONS[:-1]:
+            sections.append("\0".join(getattr(self, name)).encode("utf-8"))
+        sections.append("\0".join(self.names.keys).encode("utf-8"))
+
+        header = bytearray(SNAPSHOT_MAGIC)
+        header += struct.pack("<I", SNAPSHOT_VERSION)
+        for stamp in source_stamps(directory):
+            header += struct.pack("<qq", *stamp)
+        position = header_size()
+        for section in sections:
+            header += struct.pack("<qq", position, len(section))
+            position += padded(len(section))
+
+        path = os.path.join(directory, SNAPSHOT)
+        with open(f"{path}.tmp", "wb") as f:
+            f.write(header.ljust(header_size(), b"\0"))
+            for section in sections:
+                f.write(section)
+                f.write(bytes(padded(len(section)) - len(section)))
+        os.replace(f"{path}.tmp", path)
+
+    def load_snapshot(self, directory, arrays_only=False):
+        """
+        Memory-map the snapshot in `directory` if it exists and matches
+        the current source CSVs. Returns whether the graph was loaded.
+
+        With `arrays_only`, only the adjacency arrays are mapped: ids,
+        names and titles are not decoded and the id lookups are not
+        built, so nothing proportional to the graph is copied into the
+        process, but only searches over indices can be run.
+        """
+        path = os.path.join(directory, SNAPSHOT)
+        try:
+            with open(path, "rb") as f:
+                snapshot = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            stamps = source_stamps(directory)
+        except (OSError, ValueError):
+            return False
+
+        if len(snapshot) < header_size() or snapshot[:len(SNAPSHOT_MAGIC)] != SNAPSHOT_MAGIC:
+            snapshot.close()
+            return False
+        position = len(SNAPSHOT_MAGIC)
+        version, = struct.unpack_from("<I", snapshot, position)
+        position += 4
+        stored = [struct.unpack_from("<qq", snapshot, position + 16 * i) for i in range(len(SOURCES))]
+        if version != SNAPSHOT_VERSION or stored != stamps:
+            snapshot.close()
+            return False
+        position += 16 * len(SOURCES)
+
+        view = memoryview(snapshot)
+        sections = []
+        for i in range(len(ARRAY_SECTIONS) + len(TEXT_SECTIONS)):
+            offset, length = struct.unpack_from("<qq", snapshot, position + 16 * i)
+            sections.append(view[offset:offset + length])
+
+        arrays = [section.cast("i") for section in sections[:len(ARRAY_SECTIONS)]]
+        if arrays_only:
+            self.person_offsets, self.person_movies, self.movie_offsets, self.movie_stars = arrays[:4]
+            self.snapshot = snapshot
+            return True
+        num_people, num_movies, num_names = (len(arrays[i]) - 1 for i in (0, 2, 4))
+        counts = [num_people] * 3 + [num_movies] * 3 + [num_names]
+        texts = [
+            split_text(section, count)
+            for section, count in zip(sections[len(ARRAY_SECTIONS):], counts)
+        ]
+
+        (self.person_offsets, self.person_movies,
+         self.movie_offsets, self.movie_stars, name_offsets, name_people) = arrays
+        (self.person_ids, self.person_names, self.person_births,
+         self.movie_ids, self.movie_titles, self.movie_years, name_keys) = texts
+        self.names = NameIndex(name_keys, name_offsets, name_people)
+        self.person_index = dict(zip(self.person_ids, range(len(self.person_ids))))
+        self.movie_index = dict(zip(self.movie_ids, range(len(self.movie_ids))))
+        self.snapshot = snapshot
+        return True
+
+    def movies_for(self, person):
+        """Returns the movie indices a person starred in."""
+        return self.person_movies[self.person_offsets[person]:self.person_offsets[person + 1]]
+
+    def stars_for(self, movie):
+        """Returns the person indices who starred in a movie."""
+        return self.movie_stars[self.movie_offsets[movie]:self.movie_offsets[movie + 1]]
+
+    def movie_count(self, person):
+        """Returns the number of movies a person starred in."""
+        return self.person_offsets[person + 1] - self.person_offsets[person]
+
+    def complete(self, prefix, limit=10):
+        """
+        Returns up to `limit` person indices whose lowercase name starts
+        with `prefix`, most prolific first.
+        """
+        names = self.names
+        if self.name_ranking is None:
+            self.name_ranking = RangeMax(array("i", (
+                max(self.movie_count(person) for person in names.people_at(k))
+                for k in range(len(names.keys))
+            )))
+
+        # Visit keys by their best movie count until no key can improve the top `limit`
+        matches = []
+        keys = names.prefixed(prefix.lower())
+        for k in self.name_ranking.descending(keys.start, keys.stop):
+            if len(matches) >= limit and self.name_ranking.values[k] <= self.movie_count(matches[-1]):
+                break
+            matches.extend(names.people_at(k))
+            matches.sort(key=self.movie_count, reverse=True)
+            del matches[limit:]
+        return matches
+
+    def fuzzy(self, name, max_distance=2, limit=10):
+        """
+        Returns up to `limit` person indices whose lowercase name is within
+        `max_distance` edits of `name`, closest and most prolific first.
+        """
+        candidates = [
+            (distance, -self.movie_count(person), person)
+            for distance, k in self.names.within(name.lower(), max_distance)
+            for person in self.names.people_at(k)
+        ]
+        return [person for _, _, person in heapq.nsmallest(limit, candidates)]
+
+    def neighbors(self, person):
+        """
+        Yields (movie, person) index pairs for people who starred
+        with a given person, including the person themselves.
+        """
+        movie_offsets = self.movie_offsets
+        movie_stars = self.movie_stars
+        for movie in self.movies_for(person):
+            for star in movie_stars[movie_offsets[movie]:movie_offsets[movie + 1]]:
+                yield movie, star
+
+    def nbytes(self):
+        """Returns the size in bytes of the adjacency arrays."""
+        return sum(
+            len(a) * a.itemsize
+            for a in (self.person_offsets, self.person_movies,
+                      self.movie_offsets, self.movie_stars)
+        )
+
+
+def build_csr(n, sources, targets):
+    """
+    Builds CSR (offsets, values) arrays for `n` rows from parallel
+    arrays of edge sources and targets, using a counting sort.
+    """
+    offsets = array("i", bytes(4 * (n + 1)))
+    for source in sources:
+        offsets[source + 1] += 1
+    for i in range(n):
+        offsets[i + 1] += offsets[i]
+
+    values = array("i", bytes(4 * len(targets)))
+    position = offsets[:-1]
+    for source, target in zip(sources, targets):
+        values[position[source]] = target
+        position[source] += 1
+    return offsets, values
+
+
+def source_stamps(directory):
+    """Returns (mtime_ns, size) for each source CSV in `directory`."""
+    stamps = []
+    for source in SOURCES:
+        stat = os.stat(os.path.join(directory, source))
+        stamps.append((stat.st_mtime_ns, stat.st_size))
+    return stamps
+
+
+def header_size():
+    """Returns the size of a snapshot header, padded to 8 bytes."""
+    size = len(SNAPSHOT_MAGIC) + 4 + 16 * len(SOURCES)
+    size += 16 * (len(ARRAY_SECTIONS) + len(TEXT_SECTIONS))
+    return padded(size)
+
+
+def padded(length):
+    """Rounds `length` up to a multiple of 8 bytes."""
+    return (length + 7) // 8 * 8
+
+
+def split_text(section, count):
+    """Decodes a NUL-separated snapshot text section of `count` strings."""
+    if count == 0:
+        return []
+    return str(section, "utf-8").split("\0")
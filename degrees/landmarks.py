@@ -0,0 +1,180 @@
+import os
+import struct
+import sys
+import time
+from array import array
+from collections import deque
+
+from graph import Graph, source_stamps
+
+# Index file written next to the CSVs
+INDEX = "landmarks.index"
+INDEX_MAGIC = b"DEGRLMK1"
+
+# Distance stored for people a landmark cannot reach
+UNREACHABLE = 255
+
+
+class Landmarks():
+    """
+    BFS distances from a few high-degree landmark people to everyone,
+    giving bounds on degrees of separation and an admissible heuristic
+    for A* (ALT). Distances for landmark `k` are
+    `distances[k * num_people:(k + 1) * num_people]`, one byte each.
+    """
+
+    def __init__(self, people, distances, num_people):
+        self.people = people
+        self.distances = distances
+        self.num_people = num_people
+
+    @classmethod
+    def build(cls, graph, count=32):
+        """
+        Picks the `count` people with the most movies as landmarks and
+        runs a BFS from each one.
+        """
+        degree = [
+            graph.person_offsets[person + 1] - graph.person_offsets[person]
+            for person in range(graph.num_people)
+        ]
+        people = sorted(range(graph.num_people), key=lambda person: -degree[person])
+        people = array("i", people[:count])
+        distances = array("B")
+        for person in people:
+            distances.extend(distances_from(graph, person))
+        return cls(people, distances, graph.num_people)
+
+    def nbytes(self):
+        """Returns the size in bytes of the index."""
+        return len(self.distances) + len(self.people) * self.people.itemsize
+
+    def vectors(self, person):
+        """Yields the distance from each landmark to `person`."""
+        for k in range(len(self.people)):
+            yield self.distances[k * self.num_people + person]
+
+    def bounds(self, source, target):
+        """
+        Returns (lower, upper) bounds on the degrees of separation between
+        `source` and `target`. Upper is None when no landmark reaches both,
+        and both are None when the landmarks prove them disconnected.
+        """
+        lower = 0
+        upper = None
+        for s, t in zip(self.vectors(source), self.vectors(target)):
+            if (s == UNREACHABLE) != (t == UNREACHABLE):
+                return None, None
+            if s == UNREACHABLE:
+                continue
+            lower = max(lower, abs(s - t))
+            if upper is None or s + t < upper:
+                upper = s + t
+        return lower, upper
+
+    def heuristic(self, target, source=None, active=8):
+        """
+        Returns a function giving a lower bound on the distance from a
+        person to `target`, using the triangle inequality against the
+        landmarks that reach the target. When `source` is given, only the
+        `active` landmarks with the tightest bound for source are used.
+        """
+        columns = [
+            (k * self.num_people, t)
+            for k, t in enumerate(self.vectors(target)) if t != UNREACHABLE
+        ]
+        if source is not None:
+            def tightness(column):
+                s = self.distances[column[0] + source]
+                return abs(s - column[1]) if s != UNREACHABLE else -1
+            columns = sorted(columns, key=tightness, reverse=True)[:active]
+        distances = self.distances
+
+        def estimate(person):
+            best = 0
+            for offset, t in columns:
+                s = distances[offset + person]
+                if s != UNREACHABLE and abs(s - t) > best:
+                    best = abs(s - t)
+            return best
+        return estimate
+
+    def save(self, directory):
+        """Writes the index to `directory`, stamped with the source CSVs."""
+        path = os.path.join(directory, INDEX)
+        with open(f"{path}.tmp", "wb") as f:
+            f.write(INDEX_MAGIC)
+            for stamp in source_stamps(directory):
+                f.write(struct.pack("<qq", *stamp))
+            f.write(struct.pack("<qq", len(self.people), self.num_people))
+            f.write(bytes(self.people))
+            f.write(bytes(self.distances))
+        os.replace(f"{path}.tmp", path)
+
+    @classmethod
+    def load(cls, directory):
+        """
+        Reads the index from `directory`, or returns None if it is
+        missing or older than the source CSVs.
+        """
+        try:
+            with open(os.path.join(directory, INDEX), "rb") as f:
+                data = f.read()
+            stamps = source_stamps(directory)
+        except OSError:
+            return None
+
+        position = len(INDEX_MAGIC)
+        if data[:position] != INDEX_MAGIC or len(data) < position + 16 * (len(stamps) + 1):
+            return None
+        stored = []
+        for _ in stamps:
+            stored.append(struct.unpack_from("<qq", data, position))
+            position += 16
+        if stored != stamps:
+            return None
+        count, num_people = struct.unpack_from("<qq", data, position)
+        position += 16
+
+        people = array("i")
+        people.frombytes(data[position:position + count * people.itemsize])
+        position += count * people.itemsize
+        distances = array("B", data[position:position + count * num_people])
+        return cls(people, distances, num_people)
+
+
+def distances_from(graph, source):
+    """
+    Returns an array of BFS distances from `source` to every person,
+    with UNREACHABLE for people in other components.
+    """
+    distances = array("B", [UNREACHABLE]) * graph.num_people
+    distances[source] = 0
+    queue = deque([source])
+    while queue:
+        person = queue.popleft()
+        distance = min(distances[person] + 1, UNREACHABLE - 1)
+        for _, neighbor in graph.neighbors(person):
+            if distances[neighbor] == UNREACHABLE:
+                distances[neighbor] = distance
+                queue.append(neighbor)
+    return distances
+
+
+def main():
+    if len(sys.argv) not in (2, 3):
+        sys.exit("Usage: python landmarks.py directory [count]")
+    directory = sys.argv[1]
+    count = int(sys.argv[2]) if len(sys.argv) == 3 else 32
+
+    graph = Graph()
+    graph.load(directory)
+    start = time.perf_counter()
+    landmarks = Landmarks.build(graph, count)
+    elapsed = time.perf_counter() - start
+    landmarks.save(directory)
+    print(f"Built {len(landmarks.people)} landmarks in {elapsed:.3f}s, {landmarks.nbytes() / 2**20:.2f} MiB")
+
+
+if __name__ == "__main__":
+    main()
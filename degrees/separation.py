@@ -0,0 +1,110 @@
+import multiprocessing
+import random
+import sys
+import time
+from collections import Counter
+
+from graph import Graph
+from landmarks import UNREACHABLE, distances_from
+
+# Adjacency arrays mapped once per worker process from the snapshot
+graph = None
+
+
+def main():
+    if len(sys.argv) not in (2, 3, 4):
+        sys.exit("Usage: python separation.py directory [sources] [workers]")
+    directory = sys.argv[1]
+    count = int(sys.argv[2]) if len(sys.argv) >= 3 else 100
+    workers = int(sys.argv[3]) if len(sys.argv) == 4 else multiprocessing.cpu_count()
+
+    # Make sure the snapshot is current so workers can map it
+    parent = Graph()
+    parent.load(directory)
+    if not Graph().load_snapshot(directory, arrays_only=True):
+        sys.exit(f"Could not write a graph snapshot in {directory} for the workers to map.")
+    sources = sample_sources(parent, count)
+
+    start = time.perf_counter()
+    histogram, eccentricities = separation_statistics(directory, sources, workers)
+    elapsed = time.perf_counter() - start
+
+    pairs = sum(count for distance, count in histogram.items() if distance != UNREACHABLE)
+    print(f"Separation from {len(sources)} sources using {workers} workers:")
+    for distance in sorted(histogram):
+        label = "unreachable" if distance == UNREACHABLE else f"{distance} degrees"
+        share = histogram[distance] / max(sum(histogram.values()), 1)
+        print(f"  {label:>12}: {histogram[distance]} ({share:.2%})")
+    if pairs:
+        mean = sum(d * c for d, c in histogram.items() if d != UNREACHABLE) / pairs
+        print(f"  Mean separation: {mean:.3f}")
+    if eccentricities:
+        print(f"  Eccentricity: min {min(eccentricities)}, "
+              f"mean {sum(eccentricities) / len(eccentricities):.2f}, "
+              f"max {max(eccentricities)} (lower bound on diameter)")
+    print(f"  Time: {elapsed:.3f}s, {len(sources) / elapsed:.1f} sources/s")
+
+
+def sample_sources(graph, count, seed=0):
+    """
+    Returns up to `count` distinct random people who starred in something.
+    """
+    actors = [
+        person for person in range(graph.num_people)
+        if graph.person_offsets[person] != graph.person_offsets[person + 1]
+    ]
+    return random.Random(seed).sample(actors, min(count, len(actors)))
+
+
+def separation_statistics(directory, sources, workers, chunk_size=4):
+    """
+    Runs a BFS from every source across a pool of `workers` processes.
+    Returns the merged histogram mapping distance -> number of people
+    (UNREACHABLE for people in other components) and a list of source
+    eccentricities.
+    """
+    shards = [sources[i:i + chunk_size] for i in range(0, len(sources), chunk_size)]
+    histogram = Counter()
+    eccentricities = []
+    with multiprocessing.Pool(workers, initializer=init_worker, initargs=(directory,)) as pool:
+        for shard_histogram, shard_eccentricities in pool.imap_unordered(run_shard, shards):
+            histogram.update(shard_histogram)
+            eccentricities.extend(shard_eccentricities)
+    return histogram, eccentricities
+
+
+def init_worker(directory):
+    """
+    Maps the adjacency arrays of the graph snapshot read-only, so their
+    pages are shared between workers through the page cache rather
+    than pickled or copied. Names and ids are not loaded at all.
+    """
+    global graph
+    graph = Graph()
+    if not graph.load_snapshot(directory, arrays_only=True):
+        graph = None
+
+
+def run_shard(sources):
+    """
+    Returns the distance histogram and eccentricities for a shard of sources.
+    """
+    if graph is None:
+        raise Exception("no graph snapshot up to date with the CSVs to map")
+    histogram = Counter()
+    eccentricities = []
+    for source in sources:
+        distances = distances_from(graph, source).tobytes()
+        eccentricity = 0
+        for distance in range(1, UNREACHABLE + 1):
+            count = distances.count(distance)
+            if count:
+                histogram[distance] += count
+                if distance != UNREACHABLE:
+                    eccentricity = distance
+        eccentricities.append(eccentricity)
+    return histogram, eccentricities
+
+
+if __name__ == "__main__":
+    main()
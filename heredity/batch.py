@@ -0,0 +1,111 @@
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+from heredity import infer, load_data
+
+# Families handed to a worker at a time
+CHUNK_SIZE = 16
+
+ENGINES = ["elimination", "vectorized", "pruned", "enumerate"]
+
+
+def main():
+    if len(sys.argv) not in (3, 4, 5):
+        sys.exit("Usage: python batch.py (directory | manifest) output.jsonl [engine] [workers]")
+    source, output = sys.argv[1], sys.argv[2]
+    engine = sys.argv[3] if len(sys.argv) >= 4 else "elimination"
+    workers = int(sys.argv[4]) if len(sys.argv) == 5 else os.cpu_count()
+    if engine not in ENGINES:
+        sys.exit(f"Engine must be one of: {', '.join(ENGINES)}")
+
+    paths = family_paths(source)
+    start = time.perf_counter()
+    failed = 0
+    with open(f"{output}.tmp", "w") as f:
+        for result in run_families(paths, engine, workers):
+            failed += "error" in result
+            f.write(json.dumps(result) + "\n")
+    os.replace(f"{output}.tmp", output)
+    elapsed = time.perf_counter() - start
+    print(f"{len(paths)} families ({failed} failed) in {elapsed:.3f}s with {workers} workers")
+
+
+def family_paths(source):
+    """
+    Returns the family CSV paths to run: every .csv file in `source`,
+    sorted, if it is a directory, otherwise the paths listed one per
+    line in the manifest file `source`, relative to its directory.
+    Blank lines and lines starting with "#" are skipped.
+    """
+    if os.path.isdir(source):
+        return [
+            os.path.join(source, filename)
+            for filename in sorted(os.listdir(source))
+            if filename.endswith(".csv")
+        ]
+    base = os.path.dirname(source)
+    with open(source) as f:
+        lines = [line.strip() for line in f]
+    return [os.path.join(base, line) for line in lines if line and not line.startswith("#")]
+
+
+def run_families(paths, engine, workers):
+    """
+    Runs `engine` over every family in `paths` across a pool of
+    `workers` processes and yields one result per family, in order.
+    """
+    chunks = [paths[i:i + CHUNK_SIZE] for i in range(0, len(paths), CHUNK_SIZE)]
+    with multiprocessing.Pool(workers, initializer=init_worker, initargs=(engine,)) as pool:
+        for results in pool.imap(run_chunk, chunks):
+            yield from results
+
+
+def init_worker(engine):
+    """
+    Builds the engine's tables from PROBS once per worker, so each
+    family only pays for its own CSV and inference.
+    """
+    global infer_family
+    if engine == "elimination":
+        from elimination import elimination_probabilities, gene_tables
+        tables = gene_tables()
+        infer_family = lambda people: elimination_probabilities(people, tables)
+    elif engine == "vectorized":
+        from vectorized import probability_tables, vectorized_probabilities
+        tables = probability_tables()
+        infer_family = lambda people: vectorized_probabilities(people, tables=tables)
+    else:
+        infer_family = lambda people: infer(people, engine)
+
+
+def run_chunk(paths):
+    """
+    Returns a result dict for each family CSV in `paths`: its path,
+    number of people, load and inference times, and the gene and trait
+    distribution of every person, or an error message.
+    """
+    results = []
+    for path in paths:
+        result = {"family": path}
+        try:
+            start = time.perf_counter()
+            people = load_data(path)
+            loaded = time.perf_counter()
+            probabilities = infer_family(people)
+            finished = time.perf_counter()
+        except (OSError, KeyError, ValueError, ZeroDivisionError) as error:
+            result["error"] = f"{type(error).__name__}: {error}"
+        else:
+            result["people"] = len(people)
+            result["load_seconds"] = loaded - start
+            result["infer_seconds"] = finished - loaded
+            result["probabilities"] = probabilities
+        results.append(result)
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+import heapq
+import itertools
+
+from heredity import PROBS, empty_probabilities, inheritance
+
+GENES = (0, 1, 2)
+
+# Largest clique to build a table for: 3^12 entries
+MAX_CLIQUE = 12
+
+
+class Factor():
+    """
+    A table over the gene counts of some people: `table` maps every
+    tuple of gene counts, in the order of `variables`, to a value.
+    """
+
+    def __init__(self, variables, table):
+        self.variables = tuple(variables)
+        self.table = table
+
+    @classmethod
+    def ones(cls, variables):
+        """Returns the factor that is 1 for every assignment of `variables`."""
+        return cls(variables, {genes: 1.0 for genes in itertools.product(GENES, repeat=len(variables))})
+
+    def multiply(self, other):
+        """Returns the product of this factor and `other`."""
+        variables = self.variables + tuple(v for v in other.variables if v not in self.variables)
+        mine = [variables.index(v) for v in self.variables]
+        theirs = [variables.index(v) for v in other.variables]
+        table = {}
+        for genes in itertools.product(GENES, repeat=len(variables)):
+            table[genes] = (
+                self.table[tuple(genes[i] for i in mine)]
+                * other.table[tuple(genes[i] for i in theirs)]
+            )
+        return Factor(variables, table)
+
+    def marginal(self, variables):
+        """Returns this factor summed over everyone not in `variables`."""
+        keep = [i for i, v in enumerate(self.variables) if v in variables]
+        table = {}
+        for genes, value in self.table.items():
+            key = tuple(genes[i] for i in keep)
+            table[key] = table.get(key, 0) + value
+        return Factor([self.variables[i] for i in keep], table)
+
+    def normalized(self):
+        """Returns this factor scaled to sum to 1."""
+        total = sum(self.table.values())
+        if total == 0:
+            raise ValueError("evidence has zero probability")
+        return Factor(self.variables, {genes: value / total for genes, value in self.table.items()})
+
+
+def gene_tables():
+    """
+    Returns the tables factors are built from: PROBS["gene"] and
+    PROBS["trait"], and the child gene distribution for every pair of
+    parent gene counts, so that it is worked out once rather than per
+    person.
+    """
+    return {
+        "gene": PROBS["gene"],
+        "trait": PROBS["trait"],
+        "inheritance": {
+            (mother_genes, father_genes): inheritance(mother_genes, father_genes)
+            for mother_genes, father_genes in itertools.product(GENES, repeat=2)
+        },
+    }
+
+
+def person_factor(people, person, tables):
+    """
+    Returns the factor over a person's gene count (and their parents',
+    if known) holding the probability of that gene count times the
+    probability of their observed trait, if any, from `gene_tables()`.
+    """
+    mother = people[person]["mother"]
+    father = people[person]["father"]
+    trait = people[person]["trait"]
+
+    def evidence(genes):
+        return 1.0 if trait is None else tables["trait"][genes][trait]
+
+    if mother is None and father is None:
+        return Factor((person,), {(g,): tables["gene"][g] * evidence(g) for g in GENES})
+    if mother is None or father is None:
+        raise ValueError(f"{person} must have both parents or neither")
+    table = {}
+    for mother_genes, father_genes in itertools.product(GENES, repeat=2):
+        child = tables["inheritance"][(mother_genes, father_genes)]
+        for g in GENES:
+            table[(g, mother_genes, father_genes)] = child[g] * evidence(g)
+    return Factor((person, mother, father), table)
+
+
+def elimination_order(people):
+    """
+    Returns an elimination order for the moralized family graph (each
+    person joined to their parents, and parents to each other) chosen
+    greedily by fewest remaining neighbours, and the clique of each
+    person: themselves plus their neighbours when eliminated.
+
+    On family trees without loops every clique has at most three people.
+    """
+    neighbours = {person: set() for person in people}
+    for person in people:
+        family = [person, people[person]["mother"], people[person]["father"]]
+        family = [member for member in family if member is not None]
+        for a, b in itertools.combinations(family, 2):
+            neighbours[a].add(b)
+            neighbours[b].add(a)
+
+    # Heap of (degree, tiebreak, person); stale entries are skipped
+    tiebreak = {person: i for i, person in enumerate(people)}
+    heap = [(len(neighbours[person]), tiebreak[person], person) for person in people]
+    heapq.heapify(heap)
+    order = []
+    cliques = {}
+    while heap:
+        degree, _, person = heapq.heappop(heap)
+        if person in cliques or degree != len(neighbours[person]):
+            continue
+        order.append(person)
+        cliques[person] = (person,) + tuple(sorted(neighbours[person], key=tiebreak.get))
+        for a in neighbours[person]:
+            neighbours[a].discard(person)
+            neighbours[a].update(b for b in neighbours[person] if b != a)
+            heapq.heappush(heap, (len(neighbours[a]), tiebreak[a], a))
+        del neighbours[person]
+    return order, cliques
+
+
+def elimination_probabilities(people, tables=None):
+    """
+    Return normalized gene and trait distributions for every person by
+    sum-product message passing on the junction tree built from an
+    elimination order. The clique of each eliminated person sends its
+    message to the clique of the first of its neighbours eliminated
+    after it; one pass up and one back down give every person's
+    marginal, in time linear in the number of people on family trees.
+    Messages and the products they are combined into are normalized as
+    they are built, so that large families and wide sibships do not
+    underflow. `tables` defaults to a fresh `gene_tables()`.
+    """
+    tables = tables or gene_tables()
+    order, cliques = elimination_order(people)
+    largest = max((len(clique) for clique in cliques.values()), default=0)
+    if largest > MAX_CLIQUE:
+        raise ValueError(f"family has too many loops: a clique of {largest} people")
+    position = {person: i for i, person in enumerate(order)}
+
+    # Each clique's parent is the clique of its earliest-eliminated neighbour
+    parent = {}
+    children = {person: [] for person in order}
+    for person in order:
+        separator = cliques[person][1:]
+        if separator:
+            parent[person] = min(separator, key=position.get)
+            children[parent[person]].append(person)
+
+    # Each person's factor goes to the clique of its earliest-eliminated member
+    potentials = {person: Factor.ones(cliques[person]) for person in order}
+    for person in people:
+        factor = person_factor(people, person, tables)
+        home = min(factor.variables, key=position.get)
+        potentials[home] = potentials[home].multiply(factor).normalized()
+
+    # Upward pass: children are always eliminated before their parent
+    up = {}
+    for person in order:
+        belief = potentials[person]
+        for child in children[person]:
+            belief = belief.multiply(up[child]).normalized()
+        if person in parent:
+            up[person] = belief.marginal(cliques[person][1:]).normalized()
+
+    # Downward pass, combining each clique's belief as it is reached. The
+    # message to each child leaves out that child's own upward message:
+    # it is the product of the messages of the children before it, built
+    # as we go, and of those after it, built beforehand from the end.
+    down = {}
+    beliefs = {}
+    for person in reversed(order):
+        incoming = potentials[person]
+        if person in down:
+            incoming = incoming.multiply(down[person]).normalized()
+        after = [Factor.ones(cliques[person])]
+        for child in reversed(children[person]):
+            after.append(after[-1].multiply(up[child]).normalized())
+        after.reverse()
+        for i, child in enumerate(children[person]):
+            message = incoming.multiply(after[i + 1])
+            down[child] = message.marginal(cliques[child][1:]).normalized()
+            incoming = incoming.multiply(up[child]).normalized()
+        beliefs[person] = incoming
+
+    probabilities = empty_probabilities(people)
+    for person in people:
+        genes = beliefs[person].marginal((person,)).table
+        total = sum(genes.values())
+        trait = people[person]["trait"]
+        for g in GENES:
+            probabilities[person]["gene"][g] = genes[(g,)] / total
+        for value in (True, False):
+            if trait is None:
+                probabilities[person]["trait"][value] = sum(
+                    probabilities[person]["gene"][g] * tables["trait"][g][value] for g in GENES
+                )
+            else:
+                probabilities[person]["trait"][value] = 1.0 if trait == value else 0.0
+    return probabilities
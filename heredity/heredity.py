@@ -1,5 +1,6 @@
 import csv
 import itertools
+import math
 import sys
 
 PROBS = {
@@ -20,16 +21,73 @@ PROBS = {
 
 def main():
     # Check for proper usage
-    if len(sys.argv) != 2:
-        sys.exit("Usage: python heredity.py data.csv")
+    if len(sys.argv) not in (2, 3):
+        sys.exit("Usage: python heredity.py data.csv [engine]")
+    engine = sys.argv[2] if len(sys.argv) == 3 else "enumerate"
     people = load_data(sys.argv[1])
 
     # Keep track of gene and trait probabilities for each person
-    probabilities = {
+    probabilities = infer(people, engine)
+
+    # Print results
+    for person in people:
+        print(f"{person}:")
+        for field in probabilities[person]:
+            print(f"  {field.capitalize()}:")
+            for value in probabilities[person][field]:
+                p = probabilities[person][field][value]
+                print(f"    {value}: {p:.4f}")
+
+
+def infer(people, engine="enumerate"):
+    """
+    Return normalized gene and trait distributions for every person.
+
+    `engine` is "enumerate" to sum the joint probability over every
+    assignment of genes and traits, "pruned" to do so only over
+    assignments that agree with the observed traits, "parallel" to
+    split that enumeration across a process pool (see parallel.py),
+    "vectorized" to evaluate blocks of assignments at once with NumPy
+    (see vectorized.py), "elimination" for exact message passing over
+    the family tree (see elimination.py), or "sampling" for approximate
+    distributions from Gibbs sampling (see sampling.py).
+    """
+    if engine == "sampling":
+        from sampling import sample_probabilities
+        return sample_probabilities(people)[0]
+    if engine == "elimination":
+        from elimination import elimination_probabilities
+        return elimination_probabilities(people)
+    if engine == "vectorized":
+        from vectorized import vectorized_probabilities
+        return vectorized_probabilities(people)
+    if engine == "parallel":
+        from parallel import parallel_probabilities
+        return parallel_probabilities(people)
+    if engine == "pruned":
+        return pruned_probabilities(people)
+    if engine != "enumerate":
+        raise ValueError(f"unknown engine {engine}")
+    return enumerate_probabilities(people)
+
+
+def empty_probabilities(people):
+    """
+    Return a table of zero gene and trait probabilities for every person.
+    """
+    return {
         person: {"gene": {2: 0, 1: 0, 0: 0}, "trait": {True: 0, False: 0}}
         for person in people
     }
 
+
+def enumerate_probabilities(people):
+    """
+    Return gene and trait distributions for every person by summing
+    the joint probability over every consistent assignment.
+    """
+    probabilities = empty_probabilities(people)
+
     # Loop over all sets of people who might have the trait
     names = set(people)
     for have_trait in powerset(names):
@@ -53,15 +111,36 @@ def main():
 
     # Ensure probabilities sum to 1
     normalize(probabilities)
+    return probabilities
 
-    # Print results
-    for person in people:
-        print(f"{person}:")
-        for field in probabilities[person]:
-            print(f"  {field.capitalize()}:")
-            for value in probabilities[person][field]:
-                p = probabilities[person][field][value]
-                print(f"    {value}: {p:.4f}")
+
+def pruned_probabilities(people):
+    """
+    Return the same distributions as `enumerate_probabilities`, but fix
+    every observed trait up front and only enumerate the traits of
+    unobserved people, generating each assignment as it is needed
+    rather than building lists of subsets.
+
+    The joint probability is computed once per gene assignment, with
+    every unobserved person lacking the trait; giving the trait to a
+    set of them scales it by their odds of having it.
+    """
+    probabilities = empty_probabilities(people)
+    observed = {person for person in people if people[person]["trait"]}
+    unobserved = [person for person in people if people[person]["trait"] is None]
+
+    for one_gene, two_genes in gene_assignments(people):
+        base = joint_probability(people, one_gene, two_genes, observed)
+        odds = dict()
+        for person in unobserved:
+            genes = 1 if person in one_gene else 2 if person in two_genes else 0
+            odds[person] = PROBS["trait"][genes][True] / PROBS["trait"][genes][False]
+        for have_trait in subsets(unobserved):
+            p = base * math.prod(odds[person] for person in have_trait)
+            update(probabilities, one_gene, two_genes, have_trait | observed, p)
+
+    normalize(probabilities)
+    return probabilities
 
 
 def load_data(filename):
@@ -104,6 +183,27 @@ def powerset(s):
     ]
 
 
+def subsets(s):
+    """
+    Yield every subset of s as a set, one at a time.
+    """
+    s = list(s)
+    for r in range(len(s) + 1):
+        for subset in itertools.combinations(s, r):
+            yield set(subset)
+
+
+def gene_assignments(people):
+    """
+    Yield (one_gene, two_genes) for every way of giving each person
+    0, 1 or 2 copies of the gene, one assignment at a time.
+    """
+    people = set(people)
+    for one_gene in subsets(people):
+        for two_genes in subsets(people - one_gene):
+            yield one_gene, two_genes
+
+
 def parent(one_gene, two_genes, mother, father):
     """
     this function returns the probability with which a person inherits the gene from their mother and father.
@@ -125,6 +225,21 @@ def parent(one_gene, two_genes, mother, father):
     return mother_side, father_side
 
 
+def inheritance(mother_genes, father_genes):
+    """
+    Return the distribution of a child's gene count given the gene
+    counts of their mother and father, as a dictionary like PROBS["gene"].
+    """
+    passes = {0: PROBS["mutation"], 1: 0.5, 2: 1 - PROBS["mutation"]}
+    mother_side = passes[mother_genes]
+    father_side = passes[father_genes]
+    return {
+        2: mother_side * father_side,
+        1: mother_side * (1 - father_side) + (1 - mother_side) * father_side,
+        0: (1 - mother_side) * (1 - father_side),
+    }
+
+
 def joint_probability(people, one_gene, two_genes, have_trait):
     """
     Compute and return a joint probability.
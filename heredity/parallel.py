@@ -0,0 +1,79 @@
+import itertools
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from heredity import empty_probabilities, joint_probability, load_data, normalize, subsets, update
+
+# Shards handed out per worker, so that uneven shards even out
+SHARDS_PER_WORKER = 8
+
+
+def main():
+    if len(sys.argv) < 2:
+        sys.exit("Usage: python parallel.py data.csv [workers ...]")
+    people = load_data(sys.argv[1])
+    counts = [int(workers) for workers in sys.argv[2:]] or [1, 2, 4, os.cpu_count()]
+
+    print(f"Sharded enumeration over {len(people)} people ({os.cpu_count()} CPUs):")
+    baseline = None
+    for workers in sorted(set(counts)):
+        start = time.perf_counter()
+        parallel_probabilities(people, workers)
+        elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+        print(f"  {workers:3} workers: {elapsed:8.3f}s, speedup {baseline / elapsed:5.2f}x")
+
+
+def shard_probabilities(people, shard, shards):
+    """
+    Return unnormalized gene and trait totals over one shard of the
+    enumeration. The (have_trait, one_gene) pairs are numbered in order,
+    with observed traits fixed, and shard `shard` of `shards` takes
+    every pair whose number is `shard` modulo `shards`, with all of its
+    `two_genes` sets.
+    """
+    probabilities = empty_probabilities(people)
+    names = set(people)
+    observed = {person for person in people if people[person]["trait"]}
+    unobserved = [person for person in people if people[person]["trait"] is None]
+
+    pairs = itertools.product(subsets(unobserved), subsets(names))
+    for have_trait, one_gene in itertools.islice(pairs, shard, None, shards):
+        have_trait = have_trait | observed
+        for two_genes in subsets(names - one_gene):
+            p = joint_probability(people, one_gene, two_genes, have_trait)
+            update(probabilities, one_gene, two_genes, have_trait, p)
+    return probabilities
+
+
+def merge(probabilities, partial):
+    """
+    Add the totals in `partial` into `probabilities`.
+    """
+    for person in probabilities:
+        for field in probabilities[person]:
+            for value in probabilities[person][field]:
+                probabilities[person][field][value] += partial[person][field][value]
+
+
+def parallel_probabilities(people, workers=None, shards=None):
+    """
+    Return the same distributions as `enumerate_probabilities`, with the
+    enumeration split into disjoint shards run across a process pool.
+    Each worker returns a partial table, and the tables are merged and
+    normalized here.
+    """
+    workers = workers or os.cpu_count()
+    shards = shards or workers * SHARDS_PER_WORKER
+    probabilities = empty_probabilities(people)
+    with ProcessPoolExecutor(workers) as pool:
+        for partial in pool.map(shard_probabilities, [people] * shards, range(shards), [shards] * shards):
+            merge(probabilities, partial)
+    normalize(probabilities)
+    return probabilities
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+import sys
+import time
+
+import numpy as np
+
+from heredity import empty_probabilities, load_data
+from vectorized import Family, probability_tables
+
+SAMPLES = 100000
+GROUPS = 20
+
+
+def main():
+    if len(sys.argv) not in (2, 3, 4):
+        sys.exit("Usage: python sampling.py data.csv [samples] [weighting|gibbs]")
+    samples = int(float(sys.argv[2])) if len(sys.argv) >= 3 else SAMPLES
+    method = sys.argv[3] if len(sys.argv) == 4 else "gibbs"
+    people = load_data(sys.argv[1])
+
+    start = time.perf_counter()
+    probabilities, errors, diagnostics = sample_probabilities(people, samples, method)
+    elapsed = time.perf_counter() - start
+
+    for person in people:
+        print(f"{person}:")
+        for field in probabilities[person]:
+            print(f"  {field.capitalize()}:")
+            for value in probabilities[person][field]:
+                p = probabilities[person][field][value]
+                print(f"    {value}: {p:.4f} ± {errors[person][field][value]:.4f}")
+    print(f"{method}: {diagnostics['samples']} samples in {elapsed:.3f}s")
+    for name, value in diagnostics.items():
+        if name != "samples":
+            print(f"  {name}: {value:.4g}")
+
+
+def topological_order(family):
+    """
+    Returns the people of a Family ordered so that parents come before
+    their children, as a list of (person, mother, father) with -1 for
+    the parents of founders.
+    """
+    parents = {int(child): (int(mother), int(father))
+               for child, mother, father in zip(family.children, family.mothers, family.fathers)}
+    order = []
+    placed = set()
+    for person in range(len(family)):
+        stack = [person]
+        while stack:
+            current = stack[-1]
+            if current in placed:
+                stack.pop()
+                continue
+            waiting = [p for p in parents.get(current, ()) if p not in placed]
+            if waiting:
+                stack.extend(waiting)
+                continue
+            stack.pop()
+            placed.add(current)
+            order.append((current, *parents.get(current, (-1, -1))))
+    return order
+
+
+def draw(rng, probabilities):
+    """Returns one gene count per row of a (samples x 3) probability array."""
+    cumulative = np.cumsum(probabilities, axis=1)
+    u = rng.random(len(probabilities)) * cumulative[:, 2]
+    return ((u >= cumulative[:, 0]).astype(np.int8) + (u >= cumulative[:, 1])).astype(np.int8)
+
+
+def likelihood_weighting(family, size, rng, tables):
+    """
+    Samples `size` gene assignments for everyone from the prior and
+    inheritance model, parents first, and weights each by the
+    probability of the observed traits. Returns the (size x people)
+    gene array and the log weights.
+    """
+    prior, trait, inherit = tables
+    genes = np.empty((size, len(family)), dtype=np.int8)
+    for person, mother, father in topological_order(family):
+        if mother < 0:
+            genes[:, person] = draw(rng, np.broadcast_to(prior, (size, 3)))
+        else:
+            genes[:, person] = draw(rng, inherit[genes[:, mother], genes[:, father]])
+    log_weights = np.log(trait[genes[:, family.observed], family.observed_traits]).sum(axis=1)
+    return genes, log_weights
+
+
+def gibbs_sweeps(family, chains, sweeps, burn_in, rng, tables):
+    """
+    Runs `chains` Gibbs samplers side by side, each starting from a
+    likelihood weighting draw. A sweep resamples every person's genes
+    from their distribution given their parents, their children (with
+    the children's other parents) and their observed trait. Yields the
+    (chains x people) gene array after each of `sweeps` sweeps that
+    follow `burn_in` unrecorded ones.
+    """
+    prior, trait, inherit = tables
+    log_prior, log_trait, log_inherit = np.log(prior), np.log(trait), np.log(inherit)
+    genes, _ = likelihood_weighting(family, chains, rng, tables)
+
+    evidence = np.zeros((len(family), 3))
+    evidence[family.observed] = log_trait[:, family.observed_traits].T
+    offspring = {person: [] for person in range(len(family))}
+    for child, mother, father in zip(family.children.tolist(), family.mothers.tolist(), family.fathers.tolist()):
+        offspring[mother].append((child, father, True))
+        offspring[father].append((child, mother, False))
+    order = topological_order(family)
+
+    for sweep in range(burn_in + sweeps):
+        for person, mother, father in order:
+            if mother < 0:
+                log_p = np.broadcast_to(log_prior + evidence[person], (chains, 3)).copy()
+            else:
+                log_p = log_inherit[genes[:, mother], genes[:, father]] + evidence[person]
+            for child, other, is_mother in offspring[person]:
+                if is_mother:
+                    log_p += log_inherit[:, genes[:, other], genes[:, child]].T
+                else:
+                    log_p += log_inherit[genes[:, other], :, genes[:, child]]
+            log_p -= log_p.max(axis=1, keepdims=True)
+            genes[:, person] = draw(rng, np.exp(log_p))
+        if sweep >= burn_in:
+            yield genes
+
+
+def sample_probabilities(people, samples=SAMPLES, method="gibbs", seed=None, groups=GROUPS,
+                         chains=1000, burn_in=50):
+    """
+    Estimate gene and trait distributions for every person by sampling
+    from the PROBS model with the observed traits as evidence, spending
+    about `samples` draws. `method` is "weighting" for likelihood
+    weighting, or "gibbs" for `chains` Gibbs samplers run side by side
+    after `burn_in` sweeps (a sweep of every chain counts as `chains`
+    samples). Unobserved traits are estimated from each sample's
+    genes rather than sampled.
+
+    The draws are split into `groups` independent groups (batches of
+    weighted samples, or sets of chains), and each reported standard
+    error is the spread of the group estimates over sqrt(groups).
+
+    Return (probabilities, standard errors, diagnostics), the first two
+    in the format of `enumerate_probabilities`. Diagnostics hold the
+    number of samples, the largest standard error, and the effective
+    sample size of the weights (which collapses towards 1 on large
+    families with many observed traits, where Gibbs sampling should be
+    used) or, for Gibbs, the fraction of estimates whose first and
+    second half of the sweeps differ by more than 3 standard errors
+    (about 0.003 once the chains have mixed).
+    """
+    family = Family(people)
+    tables = probability_tables()
+    trait = tables[1]
+    rng = np.random.default_rng(seed)
+    n = len(family)
+
+    def features(genes, weights):
+        """Returns weighted totals of each gene count and of the trait, per person."""
+        totals = np.empty((n, 4))
+        for g in range(3):
+            totals[:, g] = weights @ (genes == g)
+        totals[:, 3] = weights @ trait[genes, 1]
+        return totals
+
+    diagnostics = {}
+    if method == "weighting":
+        size = max(1, samples // groups)
+        shifts, weight_sums, square_sums, totals = [], [], [], []
+        for _ in range(groups):
+            genes, log_weights = likelihood_weighting(family, size, rng, tables)
+            shifts.append(log_weights.max())
+            weights = np.exp(log_weights - shifts[-1])
+            weight_sums.append(weights.sum())
+            square_sums.append((weights ** 2).sum())
+            totals.append(features(genes, weights))
+        scale = np.exp(np.array(shifts) - max(shifts))
+        weight_sums = np.array(weight_sums) * scale
+        group_estimates = np.array(totals) / weight_sums[:, None, None] * scale[:, None, None]
+        estimate = (np.array(totals) * scale[:, None, None]).sum(axis=0) / weight_sums.sum()
+        diagnostics["effective samples"] = weight_sums.sum() ** 2 / (np.array(square_sums) * scale ** 2).sum()
+        drawn = size * groups
+    elif method == "gibbs":
+        chains = max(groups, min(chains, samples))
+        sweeps = max(2, samples // chains)
+        group_of = np.arange(chains) % groups
+        group_sizes = np.bincount(group_of, minlength=groups)
+        halves = np.zeros((2, n, 4))
+        totals = np.zeros((groups, n, 4))
+        for sweep, genes in enumerate(gibbs_sweeps(family, chains, sweeps, burn_in, rng, tables)):
+            for group in range(groups):
+                totals[group] += features(genes[group_of == group], np.ones(group_sizes[group]))
+            halves[int(sweep >= sweeps // 2)] += features(genes, np.ones(chains))
+        group_estimates = totals / (group_sizes * sweeps)[:, None, None]
+        estimate = totals.sum(axis=0) / (chains * sweeps)
+        drawn = chains * sweeps
+    else:
+        raise ValueError(f"unknown method {method}")
+
+    errors = group_estimates.std(axis=0, ddof=1) / np.sqrt(groups) if groups > 1 else np.zeros((n, 4))
+    if method == "gibbs":
+        # The halves each have about twice the variance of the whole estimate
+        first, second = halves[0] / (chains * (sweeps // 2)), halves[1] / (chains * (sweeps - sweeps // 2))
+        drift = np.abs(first - second) / np.maximum(2 * errors, 1e-12)
+        diagnostics["drifting"] = float((drift > 3).mean())
+    diagnostics = {"samples": drawn, "max error": float(errors.max()),
+                   **{name: float(value) for name, value in diagnostics.items()}}
+
+    probabilities = empty_probabilities(people)
+    standard_errors = empty_probabilities(people)
+    observed = dict(zip(family.observed.tolist(), family.observed_traits.tolist()))
+    for i, person in enumerate(family.names):
+        for g in range(3):
+            probabilities[person]["gene"][g] = float(estimate[i, g])
+            standard_errors[person]["gene"][g] = float(errors[i, g])
+        has_trait, error = (float(observed[i]), 0.0) if i in observed else (float(estimate[i, 3]), float(errors[i, 3]))
+        probabilities[person]["trait"] = {True: has_trait, False: 1 - has_trait}
+        standard_errors[person]["trait"] = {True: error, False: error}
+    return probabilities, standard_errors, diagnostics
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+import time
+import unittest
+
+from elimination import elimination_probabilities
+from heredity import infer
+
+
+def person(name, mother=None, father=None, trait=None):
+    return {"name": name, "mother": mother, "father": father, "trait": trait}
+
+
+def sibship(children):
+    """
+    Returns one couple and `children` children of theirs, with every
+    third child's trait observed and alternating between present and
+    absent.
+    """
+    people = {"Mother": person("Mother", trait=True), "Father": person("Father")}
+    for i in range(children):
+        trait = (i // 3) % 2 == 0 if i % 3 == 0 else None
+        people[f"Child {i}"] = person(f"Child {i}", "Mother", "Father", trait)
+    return people
+
+
+class TestElimination(unittest.TestCase):
+
+    def assertClose(self, probabilities, expected):
+        for name in expected:
+            for field in expected[name]:
+                for value in expected[name][field]:
+                    self.assertAlmostEqual(
+                        probabilities[name][field][value], expected[name][field][value], places=10
+                    )
+
+    def test_matches_pruned(self):
+        people = sibship(7)
+        self.assertClose(elimination_probabilities(people), infer(people, "pruned"))
+
+    def test_wide_sibship(self):
+        start = time.perf_counter()
+        probabilities = elimination_probabilities(sibship(600))
+        self.assertLess(time.perf_counter() - start, 10)
+        for name, distributions in probabilities.items():
+            self.assertAlmostEqual(sum(distributions["gene"].values()), 1)
+            self.assertAlmostEqual(sum(distributions["trait"].values()), 1)
+
+    def test_many_mates(self):
+        people = {"Father": person("Father")}
+        for i in range(800):
+            people[f"Mother {i}"] = person(f"Mother {i}")
+            people[f"Child {i}"] = person(f"Child {i}", f"Mother {i}", "Father", i % 2 == 0)
+        probabilities = elimination_probabilities(people)
+        self.assertAlmostEqual(sum(probabilities["Father"]["gene"].values()), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
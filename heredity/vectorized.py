@@ -0,0 +1,136 @@
+import numpy as np
+
+from heredity import PROBS, empty_probabilities, inheritance
+
+# Joint probabilities (gene assignments x trait assignments) evaluated at a time
+BLOCK_SIZE = 1 << 18
+
+
+class Family():
+    """
+    A family encoded as integer arrays: people are numbered in the order
+    of `people`, founders and children are listed separately with each
+    child's mother and father, and observed traits are 0 or 1.
+    """
+
+    def __init__(self, people):
+        self.names = list(people)
+        index = {person: i for i, person in enumerate(self.names)}
+        founders, children, mothers, fathers = [], [], [], []
+        for person in self.names:
+            mother = people[person]["mother"]
+            father = people[person]["father"]
+            if mother is None and father is None:
+                founders.append(index[person])
+            elif mother is None or father is None:
+                raise ValueError(f"{person} must have both parents or neither")
+            else:
+                children.append(index[person])
+                mothers.append(index[mother])
+                fathers.append(index[father])
+        self.founders = np.array(founders, dtype=np.int64)
+        self.children = np.array(children, dtype=np.int64)
+        self.mothers = np.array(mothers, dtype=np.int64)
+        self.fathers = np.array(fathers, dtype=np.int64)
+
+        traits = [people[person]["trait"] for person in self.names]
+        self.observed = np.array([i for i, trait in enumerate(traits) if trait is not None], dtype=np.int64)
+        self.observed_traits = np.array([int(traits[i]) for i in self.observed], dtype=np.int64)
+        self.unobserved = np.array([i for i, trait in enumerate(traits) if trait is None], dtype=np.int64)
+
+    def __len__(self):
+        return len(self.names)
+
+
+def probability_tables():
+    """
+    Returns PROBS as arrays indexed by gene count: the prior over genes,
+    trait[genes, trait] and inherit[mother genes, father genes, child genes].
+    """
+    prior = np.array([PROBS["gene"][g] for g in range(3)])
+    trait = np.array([[PROBS["trait"][g][False], PROBS["trait"][g][True]] for g in range(3)])
+    inherit = np.array([[[inheritance(m, f)[g] for g in range(3)] for f in range(3)] for m in range(3)])
+    return prior, trait, inherit
+
+
+def gene_block(n, start, stop):
+    """
+    Returns the gene assignments numbered `start` to `stop` as a
+    (stop - start) x n array, reading each number's base-3 digits as
+    the gene counts of people 0 to n - 1.
+    """
+    codes = np.arange(start, stop, dtype=np.int64)
+    genes = np.empty((len(codes), n), dtype=np.int8)
+    for person in range(n):
+        genes[:, person] = codes % 3
+        codes //= 3
+    return genes
+
+
+def joint_probabilities(family, genes, tables):
+    """
+    Returns the joint probability of every gene assignment in the rows
+    of `genes` with every assignment of traits to unobserved people, as
+    a (rows x 2^unobserved) array: column t gives unobserved person j
+    the trait when bit j of t is set. Observed traits are fixed.
+    """
+    prior, trait, inherit = tables
+    gene_probability = np.ones(len(genes))
+    if len(family.founders):
+        gene_probability *= prior[genes[:, family.founders]].prod(axis=1)
+    if len(family.children):
+        gene_probability *= inherit[
+            genes[:, family.mothers], genes[:, family.fathers], genes[:, family.children]
+        ].prod(axis=1)
+    if len(family.observed):
+        gene_probability *= trait[genes[:, family.observed], family.observed_traits].prod(axis=1)
+
+    bits = trait_bits(len(family.unobserved))
+    joint = np.repeat(gene_probability[:, None], len(bits), axis=1)
+    for j, person in enumerate(family.unobserved.tolist()):
+        joint *= trait[genes[:, person]][:, bits[:, j]]
+    return joint
+
+
+def trait_bits(unobserved):
+    """Returns the 2^unobserved x unobserved array of trait assignment bits."""
+    return (np.arange(1 << unobserved)[:, None] >> np.arange(unobserved)) & 1
+
+
+def vectorized_probabilities(people, block_size=BLOCK_SIZE, tables=None):
+    """
+    Return the same distributions as `enumerate_probabilities`, but
+    evaluate the joint probability of whole blocks of gene and trait
+    assignments at once with NumPy, accumulating the marginals with
+    array reductions over each block. `tables` defaults to a fresh
+    `probability_tables()`.
+    """
+    family = Family(people)
+    tables = tables or probability_tables()
+    n = len(family)
+    bits = trait_bits(len(family.unobserved))
+    rows = max(1, block_size >> len(family.unobserved))
+
+    gene_totals = np.zeros((n, 3))
+    trait_totals = np.zeros(len(family.unobserved))
+    total = 0.0
+    for start in range(0, 3 ** n, rows):
+        genes = gene_block(n, start, min(start + rows, 3 ** n))
+        joint = joint_probabilities(family, genes, tables)
+        by_genes = joint.sum(axis=1)
+        by_traits = joint.sum(axis=0)
+        for g in range(3):
+            gene_totals[:, g] += by_genes @ (genes == g)
+        trait_totals += by_traits @ bits
+        total += by_genes.sum()
+
+    probabilities = empty_probabilities(people)
+    for i, person in enumerate(family.names):
+        for g in range(3):
+            probabilities[person]["gene"][g] = float(gene_totals[i, g] / total)
+    for person, trait in zip(family.observed.tolist(), family.observed_traits.tolist()):
+        probabilities[family.names[person]]["trait"] = {True: float(trait), False: float(1 - trait)}
+    for j, person in enumerate(family.unobserved.tolist()):
+        has_trait = float(trait_totals[j] / total)
+        probabilities[family.names[person]]["trait"] = {True: has_trait, False: 1 - has_trait}
+    return probabilities
@@ -0,0 +1,102 @@
+import random
+import sys
+import time
+
+import logic
+import sat
+from logic import And, Biconditional, Not, Or, Symbol
+
+# Most symbols to run each truth table checker on
+TREE_LIMIT = 16
+TABLE_LIMIT = 26
+
+
+def main():
+    """
+    Usage: python benchmark.py [people ...]
+
+    Times solving random knights and knaves puzzles (every symbol
+    queried, as in puzzle.py) with the tree-walking truth table, the
+    compiled truth table and the SAT solver, and random 3-CNF knowledge
+    bases at the satisfiability threshold with each checker.
+    """
+    sizes = [int(size) for size in sys.argv[1:]] or [3, 5, 8, 10, 12, 25, 50, 100]
+    checkers = [
+        ("tree", logic.tree_model_check, TREE_LIMIT),
+        ("table", logic.truth_table_check, TABLE_LIMIT),
+        ("sat", sat.model_check, None),
+    ]
+
+    print("Knights and knaves puzzles (all symbols queried):")
+    for people in sizes:
+        knowledge, symbols = knights_puzzle(people)
+        report(f"{people} people", knowledge, symbols, checkers)
+
+    print("Random 3-CNF, 4.26 clauses per symbol (first symbol queried):")
+    for count in [size * 2 for size in sizes]:
+        knowledge, symbols = random_cnf(count)
+        report(f"{count} symbols", knowledge, symbols[:1], checkers)
+
+
+def report(label, knowledge, queries, checkers):
+    """Times each checker on `queries` and reports whether they agree."""
+    count = len(knowledge.symbols())
+    answers = {}
+    line = f"  {label:>12} ({count:3} symbols):"
+    for name, check, limit in checkers:
+        if limit is not None and count > limit:
+            line += f"  {name} {'-':>9} "
+            continue
+        start = time.perf_counter()
+        answers[name] = [check(knowledge, query) for query in queries]
+        line += f"  {name} {time.perf_counter() - start:8.4f}s"
+    if len({tuple(answer) for answer in answers.values()}) > 1:
+        line += "  DISAGREE"
+    print(line)
+
+
+def knights_puzzle(people, seed=0):
+    """
+    Returns a random knights and knaves puzzle: everyone is a knight or
+    a knave, and says something about one or two others that is true
+    exactly when they are a knight. Returns the knowledge base and the
+    list of symbols.
+    """
+    rng = random.Random(seed)
+    knights = [Symbol(f"{i} is a Knight") for i in range(people)]
+    knaves = [Symbol(f"{i} is a Knave") for i in range(people)]
+
+    def claim():
+        other = rng.randrange(people)
+        return rng.choice([knights, knaves])[other]
+
+    knowledge = And()
+    for i in range(people):
+        knowledge.add(Or(knights[i], knaves[i]))
+        knowledge.add(Biconditional(knaves[i], Not(knights[i])))
+        statement = rng.choice([
+            lambda: claim(),
+            lambda: And(claim(), claim()),
+            lambda: Or(claim(), claim()),
+            lambda: Not(claim()),
+        ])()
+        knowledge.add(Biconditional(knights[i], statement))
+    return knowledge, knights + knaves
+
+
+def random_cnf(count, ratio=4.26, seed=0):
+    """
+    Returns a random 3-CNF knowledge base over `count` symbols with
+    `ratio` clauses per symbol, and the list of symbols.
+    """
+    rng = random.Random(seed)
+    symbols = [Symbol(f"P{i}") for i in range(count)]
+    clauses = []
+    for _ in range(round(ratio * count)):
+        literals = [rng.choice([symbol, Not(symbol)]) for symbol in rng.sample(symbols, min(3, count))]
+        clauses.append(Or(*literals))
+    return And(*clauses), symbols
+
+
+if __name__ == "__main__":
+    main()
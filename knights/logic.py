@@ -1,3 +1,4 @@
+import functools
 import itertools
 
 
@@ -15,6 +16,22 @@ class Sentence():
         """Returns a set of all symbols in the logical sentence."""
         return set()
 
+    def bitwise(self, index):
+        """
+        Returns a Python expression computing the sentence with bitwise
+        operators, where symbol `name` is `s[index[name]]` and true is
+        `mask`, so that each bit of the result evaluates one model.
+        """
+        raise Exception("nothing to compile")
+
+    def compile(self, index):
+        """
+        Returns a function of (s, mask) evaluating `bitwise(index)`.
+        Called with single bits it evaluates one model; called with
+        truth table columns it evaluates a whole block of models at once.
+        """
+        return compile_expression(self.bitwise(index))
+
     @classmethod
     def validate(cls, sentence):
         if not isinstance(sentence, Sentence):
@@ -68,6 +85,9 @@ class Symbol(Sentence):
     def symbols(self):
         return {self.name}
 
+    def bitwise(self, index):
+        return f"s[{index[self.name]}]"
+
 
 class Not(Sentence):
     def __init__(self, operand):
@@ -92,6 +112,9 @@ class Not(Sentence):
     def symbols(self):
         return self.operand.symbols()
 
+    def bitwise(self, index):
+        return f"(mask ^ {self.operand.bitwise(index)})"
+
 
 class And(Sentence):
     def __init__(self, *conjuncts):
@@ -129,6 +152,11 @@ class And(Sentence):
     def symbols(self):
         return set.union(*[conjunct.symbols() for conjunct in self.conjuncts])
 
+    def bitwise(self, index):
+        if not self.conjuncts:
+            return "mask"
+        return pairwise("&", [conjunct.bitwise(index) for conjunct in self.conjuncts])
+
 
 class Or(Sentence):
     def __init__(self, *disjuncts):
@@ -160,6 +188,11 @@ class Or(Sentence):
     def symbols(self):
         return set.union(*[disjunct.symbols() for disjunct in self.disjuncts])
 
+    def bitwise(self, index):
+        if not self.disjuncts:
+            return "0"
+        return pairwise("|", [disjunct.bitwise(index) for disjunct in self.disjuncts])
+
 
 class Implication(Sentence):
     def __init__(self, antecedent, consequent):
@@ -191,6 +224,11 @@ class Implication(Sentence):
     def symbols(self):
         return set.union(self.antecedent.symbols(), self.consequent.symbols())
 
+    def bitwise(self, index):
+        antecedent = self.antecedent.bitwise(index)
+        consequent = self.consequent.bitwise(index)
+        return f"((mask ^ {antecedent}) | {consequent})"
+
 
 class Biconditional(Sentence):
     def __init__(self, left, right):
@@ -224,10 +262,104 @@ class Biconditional(Sentence):
     def symbols(self):
         return set.union(self.left.symbols(), self.right.symbols())
 
+    def bitwise(self, index):
+        return f"(mask ^ ({self.left.bitwise(index)} ^ {self.right.bitwise(index)}))"
 
-def model_check(knowledge, query):
-    """Checks if knowledge base entails query."""
 
+def pairwise(operator, expressions):
+    """
+    Joins `expressions` with `operator` as a balanced tree of pairs, so
+    that long conjunctions and disjunctions nest only log n deep when
+    compiled rather than n deep.
+    """
+    while len(expressions) > 1:
+        paired = [
+            f"({expressions[i]} {operator} {expressions[i + 1]})"
+            for i in range(0, len(expressions) - 1, 2)
+        ]
+        if len(expressions) % 2:
+            paired.append(expressions[-1])
+        expressions = paired
+    return expressions[0]
+
+
+@functools.lru_cache(maxsize=1024)
+def compile_expression(expression):
+    """Returns a function of (s, mask) evaluating a `bitwise` expression."""
+    return eval(f"lambda s, mask: {expression}")
+
+
+# Symbols evaluated together as the bits of one truth table block
+BLOCK_SYMBOLS = 16
+
+
+# Most symbols to check with a truth table before using the SAT solver
+TABLE_SYMBOLS = 24
+
+
+def model_check(knowledge, query):
+    """
+    Checks if knowledge base entails query: by truth table for up to
+    TABLE_SYMBOLS symbols, and with the SAT solver in sat.py beyond that.
+    """
+    if len(set.union(knowledge.symbols(), query.symbols())) > TABLE_SYMBOLS:
+        import sat
+        return sat.model_check(knowledge, query)
+    return truth_table_check(knowledge, query)
+
+
+def truth_table_check(knowledge, query):
+    """
+    Checks if knowledge base entails query by checking every model.
+
+    Both sentences are compiled to bitwise expressions, and models are
+    numbered as integers whose bit i is the value of the i-th symbol.
+    The lowest BLOCK_SYMBOLS symbols vary within a block of models,
+    each symbol being the column of the truth table that is set where
+    its bit is; every block is checked in one evaluation, for each
+    assignment of the remaining symbols.
+
+    Sentences nested too deeply for Python to compile are checked with
+    `tree_model_check` instead.
+    """
+    symbols = sorted(set.union(knowledge.symbols(), query.symbols()))
+    index = {symbol: i for i, symbol in enumerate(symbols)}
+    try:
+        knowledge_check = knowledge.compile(index)
+        query_check = query.compile(index)
+    except (SyntaxError, RecursionError):
+        return tree_model_check(knowledge, query)
+
+    low = min(len(symbols), BLOCK_SYMBOLS)
+    mask = (1 << (1 << low)) - 1
+    columns = [truth_table_column(i, low) for i in range(low)]
+    for high in range(1 << (len(symbols) - low)):
+        s = columns + [mask if high >> i & 1 else 0 for i in range(len(symbols) - low)]
+
+        # Any model where knowledge holds but the query does not is a counterexample
+        if knowledge_check(s, mask) & (mask ^ query_check(s, mask)):
+            return False
+    return True
+
+
+@functools.lru_cache(maxsize=None)
+def truth_table_column(i, symbols):
+    """
+    Returns the integer whose bit m is bit i of m, for every model m of
+    `symbols` symbols: runs of 2^i zeros and 2^i ones.
+    """
+    period = 1 << (i + 1)
+    run = ((1 << (1 << i)) - 1) << (1 << i)
+    return run * (((1 << (1 << symbols)) - 1) // ((1 << period) - 1))
+
+
+def tree_model_check(knowledge, query):
+    """
+    Checks if knowledge base entails query by evaluating the sentence
+    trees for every model, one dictionary per model. This was
+    `model_check` before sentences were compiled, and is kept for
+    comparison.
+    """
     def check_all(knowledge, query, symbols, model):
         """Checks if knowledge base entails query, given a particular model."""
 
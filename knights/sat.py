@@ -0,0 +1,232 @@
+from logic import And, Biconditional, Implication, Not, Or, Sentence, Symbol
+
+
+class CNF():
+    """
+    Clauses in conjunctive normal form over numbered variables, with
+    literals as signed integers: v for variable v, -v for its negation.
+    Sentences are added with the Tseitin encoding, so the clauses grow
+    linearly with the size of the sentence.
+    """
+
+    def __init__(self):
+        self.clauses = []
+        self.variables = 0
+        self.symbols = {}
+        self.literals = {}
+
+    def variable(self):
+        """Returns a new variable."""
+        self.variables += 1
+        return self.variables
+
+    def assert_sentence(self, sentence, value=True):
+        """Adds clauses requiring `sentence` to have truth value `value`."""
+        literal = self.literal(sentence)
+        self.clauses.append([literal if value else -literal])
+
+    def literal(self, sentence):
+        """
+        Returns a literal equivalent to `sentence`, adding a new variable
+        and the clauses defining it for each connective. Equal
+        subsentences share one literal.
+        """
+        if sentence in self.literals:
+            return self.literals[sentence]
+
+        if isinstance(sentence, Symbol):
+            if sentence.name not in self.symbols:
+                self.symbols[sentence.name] = self.variable()
+            literal = self.symbols[sentence.name]
+        elif isinstance(sentence, Not):
+            literal = -self.literal(sentence.operand)
+        elif isinstance(sentence, (And, Or)):
+            conjunction = isinstance(sentence, And)
+            operands = [
+                self.literal(operand)
+                for operand in (sentence.conjuncts if conjunction else sentence.disjuncts)
+            ]
+            # An Or is the negation of the And of its negated operands
+            if not conjunction:
+                operands = [-operand for operand in operands]
+            literal = self.variable()
+            for operand in operands:
+                self.clauses.append([-literal, operand])
+            self.clauses.append([literal] + [-operand for operand in operands])
+            if not conjunction:
+                literal = -literal
+        elif isinstance(sentence, Implication):
+            literal = self.literal(Or(Not(sentence.antecedent), sentence.consequent))
+        elif isinstance(sentence, Biconditional):
+            left = self.literal(sentence.left)
+            right = self.literal(sentence.right)
+            literal = self.variable()
+            self.clauses.extend([
+                [-literal, -left, right], [-literal, left, -right],
+                [literal, left, right], [literal, -left, -right],
+            ])
+        else:
+            Sentence.validate(sentence)
+            raise Exception(f"cannot convert {sentence} to CNF")
+
+        self.literals[sentence] = literal
+        return literal
+
+
+class Solver():
+    """
+    DPLL search for a satisfying assignment of a CNF. Each clause
+    watches two of its literals, and is only visited when one of them
+    becomes false, to find another literal to watch or, failing that,
+    to propagate its last unassigned literal. Pure literals are set up
+    front, and decisions pick the variable in the most clauses first.
+    """
+
+    def __init__(self, cnf):
+        self.cnf = cnf
+        self.value = [0] * (cnf.variables + 1)
+        self.trail = []
+        self.head = 0
+        self.decisions = []
+        self.watches = {}
+        for variable in range(1, cnf.variables + 1):
+            self.watches[variable] = []
+            self.watches[-variable] = []
+        self.clauses = []
+        self.units = []
+        self.conflict = False
+
+        occurrences = [0] * (cnf.variables + 1)
+        polarity = set()
+        for clause in cnf.clauses:
+            clause = list(dict.fromkeys(clause))
+            if any(-literal in clause for literal in clause):
+                continue
+            if not clause:
+                self.conflict = True
+            elif len(clause) == 1:
+                self.units.append(clause[0])
+            else:
+                self.watches[clause[0]].append(clause)
+                self.watches[clause[1]].append(clause)
+                self.clauses.append(clause)
+            for literal in clause:
+                occurrences[abs(literal)] += 1
+                polarity.add(literal)
+        self.order = sorted(range(1, cnf.variables + 1), key=lambda variable: -occurrences[variable])
+
+        # A literal whose negation appears in no clause can be made true
+        self.pure = [
+            literal for literal in polarity
+            if -literal not in polarity
+        ]
+
+    def literal_value(self, literal):
+        """Returns 1 if `literal` is true, -1 if false and 0 if unassigned."""
+        value = self.value[abs(literal)]
+        return value if literal > 0 else -value
+
+    def assign(self, literal):
+        self.value[abs(literal)] = 1 if literal > 0 else -1
+        self.trail.append(literal)
+
+    def propagate(self):
+        """
+        Applies unit propagation to every literal assigned since the
+        last call. Returns False on a conflict.
+        """
+        while self.head < len(self.trail):
+            false_literal = -self.trail[self.head]
+            self.head += 1
+            watching = self.watches[false_literal]
+            i = 0
+            while i < len(watching):
+                clause = watching[i]
+                if clause[0] == false_literal:
+                    clause[0], clause[1] = clause[1], clause[0]
+                other = clause[0]
+                if self.literal_value(other) == 1:
+                    i += 1
+                    continue
+
+                # Look for a literal that is not false to watch instead
+                for k in range(2, len(clause)):
+                    if self.literal_value(clause[k]) != -1:
+                        clause[1], clause[k] = clause[k], clause[1]
+                        self.watches[clause[1]].append(clause)
+                        watching[i] = watching[-1]
+                        watching.pop()
+                        break
+                else:
+                    if self.literal_value(other) == -1:
+                        return False
+                    self.assign(other)
+                    i += 1
+        return True
+
+    def backtrack(self):
+        """
+        Undoes assignments back to the most recent decision that has not
+        been tried both ways, and assigns it the other way. Returns False
+        if every decision has been tried both ways.
+        """
+        while self.decisions:
+            position, literal, flipped = self.decisions.pop()
+            for assigned in self.trail[position:]:
+                self.value[abs(assigned)] = 0
+            del self.trail[position:]
+            self.head = position
+            if not flipped:
+                self.decisions.append((position, -literal, True))
+                self.assign(-literal)
+                return True
+        return False
+
+    def solve(self):
+        """
+        Returns a satisfying assignment as a dictionary of variable ->
+        bool, or None if the clauses are unsatisfiable.
+        """
+        if self.conflict:
+            return None
+        for literal in self.units + self.pure:
+            value = self.literal_value(literal)
+            if value == -1:
+                return None
+            if value == 0:
+                self.assign(literal)
+
+        while True:
+            if not self.propagate():
+                if not self.backtrack():
+                    return None
+                continue
+            variable = next((variable for variable in self.order if self.value[variable] == 0), None)
+            if variable is None:
+                return {variable: self.value[variable] == 1 for variable in range(1, self.cnf.variables + 1)}
+            self.decisions.append((len(self.trail), variable, False))
+            self.assign(variable)
+
+
+def satisfiable(sentence):
+    """
+    Returns a model of `sentence` as a dictionary of symbol name -> bool,
+    or None if it is unsatisfiable.
+    """
+    cnf = CNF()
+    cnf.assert_sentence(sentence)
+    model = Solver(cnf).solve()
+    if model is None:
+        return None
+    return {name: model[variable] for name, variable in cnf.symbols.items()}
+
+
+def model_check(knowledge, query):
+    """
+    Checks if knowledge base entails query, by showing with a SAT solver
+    that knowledge together with the negation of the query has no model.
+    """
+    cnf = CNF()
+    cnf.assert_sentence(knowledge)
+    cnf.assert_sentence(query, False)
+    return Solver(cnf).solve() is None
@@ -0,0 +1,47 @@
+import random
+import unittest
+
+import logic
+from logic import And, Not, Or, Symbol
+
+symbols = [Symbol(f"P{i}") for i in range(8)]
+
+
+def nested(depth):
+    """Returns P0 nested `depth` levels deep in alternating And and Or."""
+    sentence = symbols[0]
+    for level in range(depth):
+        sentence = And(sentence, symbols[1]) if level % 2 else Or(sentence, symbols[2])
+    return sentence
+
+
+def flat(clauses, seed=0):
+    """Returns a conjunction of `clauses` random three-literal clauses."""
+    rng = random.Random(seed)
+    return And(*[
+        Or(*[rng.choice([symbol, Not(symbol)]) for symbol in rng.sample(symbols, 3)])
+        for _ in range(clauses)
+    ])
+
+
+class TestModelCheck(unittest.TestCase):
+
+    def test_deeply_nested(self):
+        knowledge = And(nested(300), symbols[1])
+        for query in [symbols[1], symbols[0], Or(symbols[0], symbols[2])]:
+            self.assertEqual(
+                logic.model_check(knowledge, query),
+                logic.tree_model_check(knowledge, query),
+            )
+
+    def test_many_clauses(self):
+        knowledge = flat(3000)
+        for query in symbols:
+            self.assertEqual(
+                logic.model_check(knowledge, query),
+                logic.tree_model_check(knowledge, query),
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
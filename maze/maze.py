@@ -1,5 +1,7 @@
+import heapq
+import itertools
 import sys
-import math
+from collections import deque
 
 class Node():
     def __init__(self, state, parent, action):
@@ -10,23 +12,33 @@ class Node():
 
 class StackFrontier():
     def __init__(self):
-        self.frontier = []
+        self.frontier = deque()
+        # Number of nodes in the frontier for each state
+        self.states = {}
 
     def add(self, node):
         self.frontier.append(node)
+        self.states[node.state] = self.states.get(node.state, 0) + 1
 
     def contains_state(self, state):
-        return any(node.state == state for node in self.frontier)
+        return state in self.states
 
     def empty(self):
         return len(self.frontier) == 0
 
+    def forget(self, node):
+        count = self.states[node.state] - 1
+        if count:
+            self.states[node.state] = count
+        else:
+            del self.states[node.state]
+
     def remove(self):
         if self.empty():
             raise Exception("empty frontier")
         else:
-            node = self.frontier[-1]
-            self.frontier = self.frontier[:-1]
+            node = self.frontier.pop()
+            self.forget(node)
             return node
 
 
@@ -36,28 +48,33 @@ class QueueFrontier(StackFrontier):
         if self.empty():
             raise Exception("empty frontier")
         else:
-            node = self.frontier[0]
-            self.frontier = self.frontier[1:]
+            node = self.frontier.popleft()
+            self.forget(node)
             return node
         
         
 class GreedyFrontier(StackFrontier):
-    
+
+    def __init__(self):
+        super().__init__()
+        # Heap of (heuristic, insertion order, node); ties go to the oldest node
+        self.frontier = []
+        self.order = itertools.count()
+
     def heuristic(self,state):
         return state[0]+state[1]
+
+    def add(self, node):
+        heapq.heappush(self.frontier, (self.heuristic(node.state), next(self.order), node))
+        self.states[node.state] = self.states.get(node.state, 0) + 1
+
     def remove(self):
         if self.empty():
             raise Exception("empty frontier")
         else:
-            h = math.inf
-            req_node = None
-            for node in self.frontier:
-                if self.heuristic(node.state) < h:
-                    req_node = node
-                    h = self.heuristic(node.state)
-            index = self.frontier.index(req_node)
-            self.frontier.pop(index)
-            return req_node
+            node = heapq.heappop(self.frontier)[2]
+            self.forget(node)
+            return node
                     
 
 class Maze():
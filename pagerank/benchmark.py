@@ -0,0 +1,230 @@
+import gc
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import scipy
+
+import pagerank
+from crawler import crawl_links
+from linkgraph import LinkGraph, write_links
+from outofcore import streamed_iteration
+from sampling import stationary_ranks
+from solvers import SOLVERS, power_iteration
+
+SIZES = [10**3, 10**4, 10**5]
+CORPORA = "synthetic"
+TOLERANCE = 1e-8
+
+# Largest corpora to write as HTML, and to run the pure Python engines on
+HTML_LIMIT = 10**6
+LOOP_SAMPLE_LIMIT = 10**4
+LOOP_ITERATE_LIMIT = 10**3
+
+
+def main():
+    """
+    Usage: python benchmark.py output.json [pages ...]
+
+    Generates synthetic power-law corpora of each size under synthetic/
+    (reused on later runs), times crawling, loading, sampling and every
+    iteration engine on them, and writes the results to output.json.
+    If output.json already exists, timings are compared against it.
+    """
+    if len(sys.argv) < 2:
+        sys.exit("Usage: python benchmark.py output.json [pages ...]")
+    output = sys.argv[1]
+    sizes = [int(float(size)) for size in sys.argv[2:]] or SIZES
+
+    results = []
+    for pages in sizes:
+        results.extend(benchmark_corpus(pages))
+
+    if os.path.exists(output):
+        with open(output) as f:
+            compare_results(json.load(f)["results"], results)
+    with open(f"{output}.tmp", "w") as f:
+        json.dump({"environment": environment(), "results": results}, f, indent=2)
+    os.replace(f"{output}.tmp", output)
+    print(f"Wrote {len(results)} results to {output}")
+
+
+def environment():
+    """Returns the settings and versions a set of results depends on."""
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "scipy": scipy.__version__,
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "damping": pagerank.DAMPING,
+        "samples": pagerank.SAMPLES,
+        "tolerance": TOLERANCE,
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def power_law_links(pages, average_degree=8, exponent=2.1, dangling=0.05, seed=0):
+    """
+    Returns (src, dst) arrays of a random link graph with power-law
+    out-degrees and in-degrees: out-degrees follow a Pareto tail scaled
+    to `average_degree`, a `dangling` fraction of pages has no links,
+    and link targets are drawn so that in-degrees fall off with
+    exponent `exponent`. Self-links and duplicate links are removed
+    afterwards, so the final average degree is lower.
+    """
+    rng = np.random.default_rng(seed)
+    tail = rng.pareto(exponent - 1, pages) + 1
+    degree = np.minimum(np.rint(tail * average_degree / tail.mean()), min(pages - 1, 1000)).astype(np.int64)
+    degree[rng.random(pages) < dangling] = 0
+
+    # Page of popularity rank r is linked to in proportion to r^-(1 / (exponent - 1))
+    src = np.repeat(np.arange(pages, dtype=np.int64), degree)
+    rank = (pages * rng.random(len(src)) ** ((exponent - 1) / (exponent - 2))).astype(np.int64)
+    dst = rng.permutation(pages)[np.minimum(rank, pages - 1)]
+
+    links = np.unique(src[src != dst] * pages + dst[src != dst])
+    return (links // pages).astype(np.int32), (links % pages).astype(np.int32)
+
+
+def page_names(pages):
+    """Returns zero-padded page names, so sorted order is numeric order."""
+    width = len(str(pages - 1))
+    return [f"{i:0{width}}.html" for i in range(pages)]
+
+
+def write_html(directory, names, src, dst):
+    """Writes one HTML file per page in `names` with its links src -> dst."""
+    os.makedirs(directory, exist_ok=True)
+    offsets = np.zeros(len(names) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(src, minlength=len(names)), out=offsets[1:])
+    order = np.argsort(src, kind="stable")
+    targets = dst[order].tolist()
+    for page, name in enumerate(names):
+        links = "".join(
+            f'<li><a href="{names[target]}">{names[target]}</a></li>\n'
+            for target in targets[offsets[page]:offsets[page + 1]]
+        )
+        with open(os.path.join(directory, name), "w") as f:
+            f.write(f"<!DOCTYPE html>\n<html>\n<body>\n<ul>\n{links}</ul>\n</body>\n</html>\n")
+
+
+def generate_corpus(pages):
+    """
+    Makes sure synthetic/<pages>.links (and, up to HTML_LIMIT pages, the
+    HTML directory synthetic/<pages>/) exist. Returns their paths, the
+    directory being None when there is no HTML version.
+    """
+    links = os.path.join(CORPORA, f"{pages}.links")
+    directory = os.path.join(CORPORA, str(pages)) if pages <= HTML_LIMIT else None
+    complete = os.path.join(CORPORA, f"{pages}.complete")
+    if not os.path.exists(complete):
+        os.makedirs(CORPORA, exist_ok=True)
+        names = page_names(pages)
+        src, dst = power_law_links(pages)
+        write_links(links, names, src, dst)
+        if directory is not None:
+            write_html(directory, names, src, dst)
+        open(complete, "w").close()
+    return links, directory
+
+
+def measure(function, *args):
+    """
+    Calls `function(*args)` once timed, then again under tracemalloc,
+    which would skew the timing. Returns (result, seconds, peak bytes).
+    """
+    gc.collect()
+    start = time.perf_counter()
+    result = function(*args)
+    seconds = time.perf_counter() - start
+    del result
+
+    gc.collect()
+    tracemalloc.start()
+    result = function(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, seconds, peak
+
+
+def benchmark_corpus(pages):
+    """
+    Runs every task and engine that fits on a corpus of `pages` pages.
+    Returns a list of result dictionaries, one per (task, engine), with
+    time, peak traced memory and, for rank estimates, the L1 and max
+    errors against a 1e-14 reference: power iteration for the iteration
+    engines, and the stationary distribution of the `transition_model`
+    chain for the samplers, which estimate that rather than PageRank.
+    """
+    start = time.perf_counter()
+    links, directory = generate_corpus(pages)
+    print(f"Corpus of {pages} pages ready in {time.perf_counter() - start:.3f}s")
+
+    graph, seconds, peak = measure(LinkGraph.load, links)
+    results = [{"task": "load", "engine": "links", "seconds": seconds, "peak_bytes": peak}]
+    graph.matrix  # build the link matrix before timing the solvers
+    references = {
+        "iterate": power_iteration(graph, pagerank.DAMPING, 1e-14, 10000)[0],
+        "sample": stationary_ranks(graph, pagerank.DAMPING, 1e-14, 10000)[0],
+    }
+
+    def record(task, engine, function, *args):
+        ranks, seconds, peak = measure(function, *args)
+        result = {"task": task, "engine": engine, "seconds": seconds, "peak_bytes": peak}
+        if task != "crawl":
+            estimate = ranks if isinstance(ranks, np.ndarray) else np.array([ranks[page] for page in graph.pages])
+            error = np.abs(estimate - references[task])
+            result["l1_error"] = float(error.sum())
+            result["max_error"] = float(error.max())
+        results.append(result)
+        return ranks
+
+    corpus = None
+    if directory is not None:
+        corpus = record("crawl", "loop", pagerank.crawl, directory)
+        record("crawl", "parallel", crawl_links, directory)
+    if pages <= LOOP_SAMPLE_LIMIT:
+        corpus = corpus or graph.to_corpus()
+        record("sample", "loop", pagerank.sample_pagerank, corpus, pagerank.DAMPING, pagerank.SAMPLES)
+    record("sample", "vectorized", pagerank.sample_pagerank, graph, pagerank.DAMPING, pagerank.SAMPLES, "vectorized")
+    if pages <= LOOP_ITERATE_LIMIT:
+        corpus = corpus or graph.to_corpus()
+        record("iterate", "loop", pagerank.iterate_pagerank, corpus, pagerank.DAMPING)
+    for engine in SOLVERS:
+        record("iterate", engine, pagerank.iterate_pagerank, graph, pagerank.DAMPING, engine, TOLERANCE)
+    record("iterate", "streamed", lambda: streamed_iteration(links, pagerank.DAMPING, TOLERANCE)[1])
+
+    for result in results:
+        result.update(pages=pages, links=len(graph.src))
+        error = f", L1 error {result['l1_error']:.2e}" if "l1_error" in result else ""
+        print(f"  {result['task']:>7} {result['engine']:>12}: {result['seconds']:8.3f}s, "
+              f"peak {result['peak_bytes'] / 2**20:8.2f} MiB{error}")
+    return results
+
+
+def compare_results(previous, results, threshold=0.1, floor=0.01):
+    """
+    Reports every (pages, task, engine) whose time changed by more than
+    `threshold` (as a fraction) since the `previous` results, ignoring
+    runs faster than `floor` seconds both times.
+    """
+    before = {(result["pages"], result["task"], result["engine"]): result for result in previous}
+    print(f"Changes of more than {threshold:.0%} against the previous results:")
+    for result in results:
+        old = before.get((result["pages"], result["task"], result["engine"]))
+        if old is None or max(old["seconds"], result["seconds"]) < floor:
+            continue
+        ratio = result["seconds"] / old["seconds"]
+        if abs(ratio - 1) > threshold:
+            label = "SLOWER" if ratio > 1 else "faster"
+            print(f"  {result['pages']:>9} {result['task']:>7} {result['engine']:>12}: "
+                  f"{old['seconds']:8.3f}s -> {result['seconds']:8.3f}s ({ratio:.2f}x, {label})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+import os
+import posixpath
+import re
+import sys
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+from linkgraph import write_links
+
+LINK = re.compile(rb"<a\s+(?:[^>]*?)href=\"([^\"]*)\"")
+
+# Bytes read from a file at a time, and files handed to a worker at a time
+BLOCK_SIZE = 1 << 20
+CHUNK_SIZE = 256
+
+
+def main():
+    if len(sys.argv) not in (3, 4):
+        sys.exit("Usage: python crawler.py directory output.links [workers]")
+    directory, output = sys.argv[1], sys.argv[2]
+    workers = int(sys.argv[3]) if len(sys.argv) == 4 else os.cpu_count()
+
+    start = time.perf_counter()
+    pages, src, dst = crawl_links(directory, workers)
+    write_links(output, pages, src, dst)
+    elapsed = time.perf_counter() - start
+    print(f"Crawled {len(pages)} pages and {len(src)} links in {elapsed:.3f}s")
+
+
+def find_pages(directory):
+    """
+    Returns the paths, relative to `directory` and using "/" separators,
+    of every .html file under it, sorted.
+    """
+    pages = []
+    for root, _, filenames in os.walk(directory):
+        relative = os.path.relpath(root, directory)
+        for filename in filenames:
+            if filename.endswith(".html"):
+                page = filename if relative == os.curdir else os.path.join(relative, filename)
+                pages.append(page.replace(os.sep, "/"))
+    return sorted(pages)
+
+
+def extract_links(path):
+    """
+    Returns the set of href values of <a> tags in the file at `path`,
+    reading it one block at a time. Any text after the last ">" in a
+    block is carried over, so tags split across blocks still match.
+    """
+    links = set()
+    carry = b""
+    with open(path, "rb") as f:
+        while True:
+            block = f.read(BLOCK_SIZE)
+            buffer = carry + block
+            end = len(buffer) if not block else buffer.rfind(b">") + 1
+            links.update(LINK.findall(buffer, 0, end))
+            carry = buffer[end:]
+            if not block:
+                break
+    return {link.decode("utf-8", "replace") for link in links}
+
+
+def parse_chunk(directory, pages):
+    """
+    Returns (page, links) for each page in a chunk, with links resolved
+    relative to the page's own directory.
+    """
+    results = []
+    for page in pages:
+        base = posixpath.dirname(page)
+        links = extract_links(os.path.join(directory, page))
+        results.append((page, {posixpath.normpath(posixpath.join(base, link)) for link in links}))
+    return results
+
+
+def parse_pages(directory, pages, workers=None):
+    """
+    Parses `pages` under `directory` across a process pool, yielding
+    (page, links) with each page's links resolved to corpus paths.
+    """
+    chunks = [pages[i:i + CHUNK_SIZE] for i in range(0, len(pages), CHUNK_SIZE)]
+    with ProcessPoolExecutor(workers) as pool:
+        for results in pool.map(parse_chunk, [directory] * len(chunks), chunks):
+            yield from results
+
+
+def crawl_links(directory, workers=None):
+    """
+    Crawls every .html file under `directory` across a process pool.
+    Returns (pages, src, dst) where each link between two different
+    crawled pages is an entry of the src/dst arrays.
+    """
+    pages = find_pages(directory)
+    index = {page: i for i, page in enumerate(pages)}
+
+    src = array("i")
+    dst = array("i")
+    for page, links in parse_pages(directory, pages, workers):
+        source = index[page]
+        for link in links:
+            target = index.get(link)
+            if target is not None and target != source:
+                src.append(source)
+                dst.append(target)
+    return pages, src, dst
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+import os
+import sys
+import time
+
+import numpy as np
+
+from crawler import find_pages, parse_pages
+from linkgraph import LinkGraph
+from sampling import link_table
+from solvers import power_iteration
+
+DAMPING = 0.85
+TOLERANCE = 1e-8
+
+
+class State():
+    """
+    What an incremental update needs from the previous run: the pages
+    with their mtimes, the links between them, links to pages that did
+    not exist yet, and the rank vector.
+    """
+
+    def __init__(self, pages, mtimes, src, dst, missing_src, missing_links, ranks):
+        self.pages = list(pages)
+        self.mtimes = np.asarray(mtimes, dtype=np.int64)
+        self.src = np.asarray(src, dtype=np.int64)
+        self.dst = np.asarray(dst, dtype=np.int64)
+        self.missing_src = np.asarray(missing_src, dtype=np.int64)
+        self.missing_links = list(missing_links)
+        self.ranks = np.asarray(ranks, dtype=float)
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            np.savez(
+                f, pages=np.array(self.pages, dtype=str), mtimes=self.mtimes,
+                src=self.src, dst=self.dst, missing_src=self.missing_src,
+                missing_links=np.array(self.missing_links, dtype=str), ranks=self.ranks,
+            )
+
+    @classmethod
+    def load(cls, path):
+        """Returns the saved State at `path`, or None if there is none."""
+        if not os.path.exists(path):
+            return None
+        with np.load(path) as data:
+            return cls(
+                data["pages"].tolist(), data["mtimes"], data["src"], data["dst"],
+                data["missing_src"], data["missing_links"].tolist(), data["ranks"],
+            )
+
+
+def main():
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    if len(args) != 2:
+        sys.exit("Usage: python incremental.py directory state.npz [--push] [--compare]")
+    directory, path = args
+    push = "--push" in sys.argv
+    compare = "--compare" in sys.argv
+
+    start = time.perf_counter()
+    state, report = update(directory, State.load(path), push=push)
+    elapsed = time.perf_counter() - start
+    state.save(path)
+    print(f"Update: {report['changed']} changed, {report['removed']} removed of {len(state.pages)} pages")
+    print(f"  {report['iterations']} iterations, {report['pushes']} pushes, {elapsed:.3f}s")
+
+    if compare:
+        start = time.perf_counter()
+        cold, report = update(directory, None)
+        elapsed = time.perf_counter() - start
+        print(f"Cold recompute: {report['iterations']} iterations, {elapsed:.3f}s")
+        print(f"  Max rank difference: {np.abs(cold.ranks - state.ranks).max():.2e}")
+
+
+def update(directory, state, damping_factor=DAMPING, tolerance=TOLERANCE, push=False, workers=None):
+    """
+    Brings `state` (None for a cold start) up to date with `directory`:
+    only pages that are new or whose mtime changed are re-crawled, and
+    power iteration is warm-started from the previous ranks, optionally
+    after local push updates around the changed pages.
+
+    Return the new State and a report of pages changed and removed,
+    iterations and pushes.
+    """
+    pages = find_pages(directory)
+    mtimes = np.array([os.stat(os.path.join(directory, page)).st_mtime_ns for page in pages], dtype=np.int64)
+    index = {page: i for i, page in enumerate(pages)}
+    n = len(pages)
+    if n == 0:
+        raise ValueError(f"no .html pages under {directory}")
+
+    # Map previous page indices to new ones (-1 for removed pages)
+    if state is None:
+        state = State([], [], [], [], [], [], [])
+    remap = np.array([index.get(page, -1) for page in state.pages], dtype=np.int64)
+    previous_mtimes = np.full(n, -1, dtype=np.int64)
+    kept = remap >= 0
+    previous_mtimes[remap[kept]] = state.mtimes[kept]
+    changed = np.flatnonzero(previous_mtimes != mtimes)
+
+    # Keep links out of unchanged pages, and resolve links to pages that now exist
+    unchanged = np.ones(n, dtype=bool)
+    unchanged[changed] = False
+    src = remap[state.src]
+    dst = remap[state.dst]
+    from_unchanged = src >= 0
+    from_unchanged[from_unchanged] &= unchanged[src[from_unchanged]]
+    keep = from_unchanged & (dst >= 0)
+    src_parts, dst_parts = [src[keep]], [dst[keep]]
+
+    # Links from unchanged pages to removed pages wait for them to return
+    removed = np.flatnonzero(from_unchanged & (dst < 0))
+    missing_src = src[removed].tolist()
+    missing_links = [state.pages[state.dst[i]] for i in removed.tolist()]
+    for source, link in zip(remap[state.missing_src].tolist(), state.missing_links):
+        if source < 0 or not unchanged[source]:
+            continue
+        if link in index:
+            src_parts.append(np.array([source]))
+            dst_parts.append(np.array([index[link]]))
+        else:
+            missing_src.append(source)
+            missing_links.append(link)
+
+    # Re-crawl changed pages
+    new_src, new_dst = [], []
+    for page, links in parse_pages(directory, [pages[i] for i in changed], workers):
+        source = index[page]
+        for link in links:
+            target = index.get(link)
+            if target is None:
+                missing_src.append(source)
+                missing_links.append(link)
+            elif target != source:
+                new_src.append(source)
+                new_dst.append(target)
+    src_parts.append(np.array(new_src, dtype=np.int64))
+    dst_parts.append(np.array(new_dst, dtype=np.int64))
+    graph = LinkGraph(pages, np.concatenate(src_parts), np.concatenate(dst_parts))
+
+    # Warm start from previous ranks, giving new pages a uniform share
+    start = np.full(n, 1 / n)
+    start[remap[kept]] = state.ranks[kept]
+    start /= start.sum()
+
+    pushes = 0
+    if push and len(changed):
+        # Push residuals above 1% of an average page's rank
+        start, pushes = push_updates(graph, start, damping_factor, 0.01 / n)
+    ranks, iterations = power_iteration(graph, damping_factor, tolerance, start=start)
+
+    state = State(pages, mtimes, graph.src, graph.dst, missing_src, missing_links, ranks)
+    report = {
+        "changed": len(changed), "removed": int((~kept).sum()),
+        "iterations": iterations, "pushes": pushes,
+    }
+    return state, report
+
+
+def push_updates(graph, ranks, damping_factor, threshold, max_pushes=None):
+    """
+    Gauss-Southwell push on the PageRank equations starting from `ranks`:
+    any page whose residual exceeds `threshold` absorbs it and passes a
+    damped share along its out-links, so work stays near the pages whose
+    links changed. Dangling pages spread their share over every page,
+    which is added to all residuals at the end.
+
+    Return the updated rank vector and the number of pushes made.
+    """
+    n = len(graph)
+    offsets, targets = link_table(graph)
+    offsets = offsets.tolist()
+    targets = targets.tolist()
+    degree = graph.out_degree.tolist()
+    max_pushes = 10 * n if max_pushes is None else max_pushes
+
+    image = damping_factor * (graph.matrix @ ranks + ranks[graph.dangling].sum() / n) + (1 - damping_factor) / n
+    queue = np.flatnonzero(np.abs(image - ranks) > threshold).tolist()
+    residual = (image - ranks).tolist()
+    ranks = ranks.tolist()
+    queued = set(queue)
+    spread = 0
+    pushes = 0
+
+    while queue and pushes < max_pushes:
+        page = queue.pop()
+        queued.discard(page)
+        amount = residual[page]
+        if abs(amount) <= threshold:
+            continue
+        ranks[page] += amount
+        residual[page] = 0
+        pushes += 1
+        if degree[page] == 0:
+            spread += damping_factor * amount / n
+            continue
+        share = damping_factor * amount / degree[page]
+        for target in targets[offsets[page]:offsets[page + 1]]:
+            residual[target] += share
+            if abs(residual[target]) > threshold and target not in queued:
+                queued.add(target)
+                queue.append(target)
+
+    ranks = np.array(ranks) + spread
+    return ranks / ranks.sum(), pushes
+
+
+if __name__ == "__main__":
+    main()
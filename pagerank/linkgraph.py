@@ -0,0 +1,119 @@
+import os
+import struct
+
+import numpy as np
+import scipy.sparse
+
+# On-disk edge list: magic, page and edge counts, the size of the
+# NUL-separated page name table, the name table padded to 8 bytes,
+# then int32 dst and src arrays with edges sorted by (dst, src)
+LINKS_MAGIC = b"PRLINKS1"
+LINKS_HEADER = struct.Struct("<8sqqq")
+
+
+class LinkGraph():
+    """
+    Integer-indexed link structure of a corpus.
+
+    Pages are numbered in sorted order, and each link from page `src[e]`
+    to page `dst[e]` is stored as one entry of the parallel edge arrays.
+    """
+
+    def __init__(self, pages, src, dst):
+        self.pages = list(pages)
+        self.index = {page: i for i, page in enumerate(self.pages)}
+        self.src = np.asarray(src, dtype=np.int64)
+        self.dst = np.asarray(dst, dtype=np.int64)
+        self.out_degree = np.bincount(self.src, minlength=len(self.pages))
+        self.dangling = self.out_degree == 0
+        self.matrix_cache = None
+
+    @classmethod
+    def from_corpus(cls, corpus):
+        """Builds a LinkGraph from a `crawl` dictionary."""
+        pages = sorted(corpus)
+        index = {page: i for i, page in enumerate(pages)}
+        src = []
+        dst = []
+        for page in pages:
+            for link in corpus[page]:
+                src.append(index[page])
+                dst.append(index[link])
+        return cls(pages, src, dst)
+
+    @classmethod
+    def load(cls, path):
+        """Reads a LinkGraph from an edge list file written by `save`."""
+        pages, dst, src = read_links(path)
+        return cls(pages, np.array(src), np.array(dst))
+
+    def save(self, path):
+        """Writes the graph as an edge list file sorted by destination."""
+        write_links(path, self.pages, self.src, self.dst)
+
+    def to_corpus(self):
+        """Returns the `crawl`-style dictionary of page -> set of linked pages."""
+        corpus = {page: set() for page in self.pages}
+        for source, target in zip(self.src.tolist(), self.dst.tolist()):
+            corpus[self.pages[source]].add(self.pages[target])
+        return corpus
+
+    def __len__(self):
+        return len(self.pages)
+
+    @property
+    def matrix(self):
+        """
+        Column-stochastic link matrix: entry (i, j) is 1 / out_degree(j)
+        when page j links to page i. Columns of dangling pages are zero.
+        """
+        if self.matrix_cache is None:
+            n = len(self.pages)
+            weights = 1 / self.out_degree[self.src]
+            self.matrix_cache = scipy.sparse.csr_matrix(
+                (weights, (self.dst, self.src)), shape=(n, n)
+            )
+        return self.matrix_cache
+
+    def to_dict(self, ranks):
+        """Maps a rank vector back to a dictionary keyed by page name."""
+        return dict(zip(self.pages, ranks.tolist()))
+
+
+def write_links(path, pages, src, dst):
+    """
+    Writes an edge list file for `pages` and the links src[e] -> dst[e].
+    """
+    src = np.asarray(src, dtype=np.int32)
+    dst = np.asarray(dst, dtype=np.int32)
+    order = np.lexsort((src, dst))
+    names = "\0".join(pages).encode("utf-8")
+    with open(f"{path}.tmp", "wb") as f:
+        f.write(LINKS_HEADER.pack(LINKS_MAGIC, len(pages), len(src), len(names)))
+        f.write(names)
+        f.write(bytes(-len(names) % 8))
+        f.write(dst[order].tobytes())
+        f.write(src[order].tobytes())
+    os.replace(f"{path}.tmp", path)
+
+
+def read_links(path, mmap_mode=None):
+    """
+    Reads an edge list file. Returns (pages, dst, src), where the edge
+    arrays are memory-mapped with `mmap_mode` (e.g. "r") if given.
+    """
+    with open(path, "rb") as f:
+        magic, num_pages, num_edges, names_length = LINKS_HEADER.unpack(f.read(LINKS_HEADER.size))
+        if magic != LINKS_MAGIC:
+            raise ValueError(f"{path} is not an edge list file")
+        names = f.read(names_length).decode("utf-8")
+    pages = names.split("\0") if num_pages else []
+
+    offset = LINKS_HEADER.size + names_length + (-names_length % 8)
+    if mmap_mode is not None and num_edges:
+        dst = np.memmap(path, dtype=np.int32, mode=mmap_mode, offset=offset, shape=(num_edges,))
+        src = np.memmap(path, dtype=np.int32, mode=mmap_mode, offset=offset + 4 * num_edges, shape=(num_edges,))
+    else:
+        edges = np.fromfile(path, dtype=np.int32, count=2 * num_edges, offset=offset)
+        dst, src = edges[:num_edges], edges[num_edges:]
+    return pages, dst, src
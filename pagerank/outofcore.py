@@ -0,0 +1,82 @@
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from linkgraph import read_links
+
+DAMPING = 0.85
+TOLERANCE = 1e-8
+
+# Edges read from the memory-mapped edge list at a time
+BLOCK_EDGES = 1 << 22
+
+
+def main():
+    if len(sys.argv) not in (2, 3):
+        sys.exit("Usage: python outofcore.py corpus.links [top]")
+    top = int(sys.argv[2]) if len(sys.argv) == 3 else 10
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    pages, ranks, iterations = streamed_iteration(sys.argv[1], DAMPING, TOLERANCE)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"PageRank of {len(pages)} pages: {iterations} iterations, {elapsed:.3f}s, peak {peak / 2**20:.2f} MiB")
+    for page in np.argsort(-ranks, kind="stable")[:top].tolist():
+        print(f"  {pages[page]}: {ranks[page]:.6f}")
+
+
+def out_degrees(src, pages, block_edges=BLOCK_EDGES):
+    """Returns the out-degree of every page, counting `src` one block at a time."""
+    degree = np.zeros(pages, dtype=np.int64)
+    for start in range(0, len(src), block_edges):
+        degree += np.bincount(src[start:start + block_edges], minlength=pages)
+    return degree
+
+
+def streamed_iteration(path, damping_factor, tolerance=1e-8, max_iterations=1000, block_edges=BLOCK_EDGES):
+    """
+    Compute PageRank by power iteration over an edge list file written
+    by crawler.py, without loading its edges: the file is memory-mapped
+    and each iteration streams it `block_edges` links at a time. As
+    edges are sorted by destination, each block only adds into the
+    slice of the new rank vector between its first and last target.
+    Only per-page arrays stay resident, so memory is O(pages).
+
+    Return a tuple of (pages, rank vector, iterations used).
+    """
+    pages, dst, src = read_links(path, mmap_mode="r")
+    n = len(pages)
+    if n == 0:
+        raise ValueError(f"{path} has no pages")
+    degree = out_degrees(src, n, block_edges)
+    dangling = degree == 0
+    inverse = np.divide(1.0, degree, out=np.zeros(n), where=~dangling)
+    del degree
+    ranks = np.full(n, 1 / n)
+
+    for iteration in range(1, max_iterations + 1):
+        share = ranks * inverse
+        new_ranks = np.zeros(n)
+        for start in range(0, len(dst), block_edges):
+            targets = np.asarray(dst[start:start + block_edges])
+            first, last = int(targets[0]), int(targets[-1])
+            new_ranks[first:last + 1] += np.bincount(
+                targets - first, weights=share[src[start:start + block_edges]], minlength=last - first + 1
+            )
+        new_ranks *= damping_factor
+        new_ranks += (damping_factor * ranks[dangling].sum() + 1 - damping_factor) / n
+        new_ranks /= new_ranks.sum()
+        delta = np.abs(new_ranks - ranks).sum()
+        ranks = new_ranks
+        if delta < tolerance:
+            break
+    return pages, ranks, iteration
+
+
+if __name__ == "__main__":
+    main()
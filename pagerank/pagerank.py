@@ -11,14 +11,15 @@ SAMPLES = 10000
 
 
 def main():
-    if len(sys.argv) != 2:
-        sys.exit("Usage: python pagerank.py corpus")
-    corpus = crawl(sys.argv[1])
-    ranks = sample_pagerank(corpus, DAMPING, SAMPLES)
+    if len(sys.argv) not in (2, 3):
+        sys.exit("Usage: python pagerank.py corpus [engine]")
+    engine = sys.argv[2] if len(sys.argv) == 3 else "loop"
+    corpus = load_corpus(sys.argv[1])
+    ranks = sample_pagerank(corpus, DAMPING, SAMPLES, "loop" if engine == "loop" else "vectorized")
     print(f"PageRank Results from Sampling (n = {SAMPLES})")
     for page in sorted(ranks):
         print(f"  {page}: {ranks[page]:.4f}")
-    ranks = iterate_pagerank(corpus, DAMPING)
+    ranks = iterate_pagerank(corpus, DAMPING, engine)
     print(f"PageRank Results from Iteration")
     for page in sorted(ranks):
         print(f"  {page}: {ranks[page]:.4f}")
@@ -48,6 +49,17 @@ def crawl(directory):
     return pages
 
 
+def load_corpus(path):
+    """
+    Return the corpus at `path`: a directory of HTML pages is crawled,
+    and an edge list file written by crawler.py is loaded as a LinkGraph.
+    """
+    if os.path.isdir(path):
+        return crawl(path)
+    from linkgraph import LinkGraph
+    return LinkGraph.load(path)
+
+
 def transition_model(corpus, page, damping_factor):
     """
     Return a probability distribution over which page to visit next,
@@ -78,15 +90,28 @@ def transition_model(corpus, page, damping_factor):
     return value
 
 
-def sample_pagerank(corpus, damping_factor, n):
+def sample_pagerank(corpus, damping_factor, n, engine="loop"):
     """
     Return PageRank values for each page by sampling `n` pages
     according to transition model, starting with a page at random.
 
+    `engine` is "loop" for a single surfer calling `transition_model`
+    at every step, or "vectorized" for many surfers stepping together
+    in NumPy batches over a precomputed link table.
+
     Return a dictionary where keys are page names, and values are
     their estimated PageRank value (a value between 0 and 1). All
     PageRank values should sum to 1.
     """
+    if engine == "vectorized":
+        from sampling import sample_ranks
+        graph = link_graph(corpus)
+        return graph.to_dict(sample_ranks(graph, damping_factor, n))
+    if engine != "loop":
+        raise ValueError(f"unknown engine {engine}")
+    if not isinstance(corpus, dict):
+        corpus = corpus.to_corpus()
+
     # initialise a dictionary of page ranks
     value = dict()
 
@@ -110,15 +135,31 @@ def sample_pagerank(corpus, damping_factor, n):
     return value
 
 
-def iterate_pagerank(corpus, damping_factor):
+def iterate_pagerank(corpus, damping_factor, engine="loop", tolerance=1e-8):
     """
     Return PageRank values for each page by iteratively updating
     PageRank values until convergence.
 
+    `engine` is "loop" for the pure Python update over every pair of
+    pages, or one of the sparse matrix solvers in `solvers.SOLVERS`
+    ("sparse" power iteration, "gauss-seidel", "aitken", "quadratic"
+    or "adaptive"; these need numpy and scipy), which run until the L1
+    change is below `tolerance`.
+
     Return a dictionary where keys are page names, and values are
     their estimated PageRank value (a value between 0 and 1). All
     PageRank values should sum to 1.
     """
+    if engine != "loop":
+        from solvers import SOLVERS
+        if engine not in SOLVERS:
+            raise ValueError(f"unknown engine {engine}")
+        graph = link_graph(corpus)
+        ranks, _ = SOLVERS[engine](graph, damping_factor, tolerance)
+        return graph.to_dict(ranks)
+    if not isinstance(corpus, dict):
+        corpus = corpus.to_corpus()
+
     # initialise threshold,N,ranks,new_ranks and change in ranks (rankDelta)
     threshold = 0.001
     N = len(corpus)
@@ -158,5 +199,48 @@ def iterate_pagerank(corpus, damping_factor):
     return ranks
 
 
+def personalized_pagerank(corpus, damping_factor, teleports, tolerance=1e-8):
+    """
+    Return PageRank values for several personalization vectors at once.
+
+    `teleports` is a list where each item is either a dictionary of
+    page -> weight or a collection of seed pages (weighted equally);
+    random jumps land on pages in proportion to those weights.
+    Needs numpy and scipy.
+
+    Return a list with one dictionary of page -> PageRank value per item.
+    Raise ValueError if an item names a page not in the corpus, has a
+    negative weight, or has no pages or no positive weight at all.
+    """
+    import numpy as np
+    from solvers import personalized_iteration
+    graph = link_graph(corpus)
+    matrix = np.zeros((len(graph), len(teleports)))
+    for column, teleport in enumerate(teleports):
+        if not isinstance(teleport, dict):
+            teleport = {page: 1 for page in teleport}
+        for page, weight in teleport.items():
+            if page not in graph.index:
+                raise ValueError(f"teleport set {column} names {page}, which is not in the corpus")
+            if weight < 0:
+                raise ValueError(f"teleport set {column} gives {page} a negative weight")
+            matrix[graph.index[page], column] = weight
+        if matrix[:, column].sum() <= 0:
+            raise ValueError(f"teleport set {column} is empty or has no positive weight")
+    matrix /= matrix.sum(axis=0)
+    ranks, _ = personalized_iteration(graph, damping_factor, matrix, tolerance)
+    return [graph.to_dict(ranks[:, column]) for column in range(len(teleports))]
+
+
+def link_graph(corpus):
+    """
+    Return `corpus` as a LinkGraph, converting a `crawl` dictionary.
+    """
+    from linkgraph import LinkGraph
+    if isinstance(corpus, LinkGraph):
+        return corpus
+    return LinkGraph.from_corpus(corpus)
+
+
 if __name__ == "__main__":
     main()
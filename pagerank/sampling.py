@@ -0,0 +1,97 @@
+import numpy as np
+
+
+def link_table(graph):
+    """
+    Returns CSR (offsets, targets) arrays of out-links for a LinkGraph:
+    the pages linked to by page `p` are `targets[offsets[p]:offsets[p + 1]]`.
+    """
+    order = np.argsort(graph.src, kind="stable")
+    offsets = np.zeros(len(graph) + 1, dtype=np.int64)
+    np.cumsum(graph.out_degree, out=offsets[1:])
+    return offsets, graph.dst[order]
+
+
+def sample_ranks(graph, damping_factor, n, surfers=1000, burn_in=50, seed=None):
+    """
+    Estimate PageRank for a LinkGraph by taking `n` samples in total from
+    `surfers` independent random surfers that step together. Each surfer
+    starts at a random page and takes `burn_in` unrecorded steps first,
+    so that short chains are not biased towards the uniform start.
+
+    Each step follows `transition_model`: a dangling page jumps to any
+    page uniformly, and otherwise the surfer follows one of the page's
+    k links with probability `damping_factor`, or picks uniformly among
+    the page and its links. Both branches are uniform draws over a
+    slice of the precomputed link table, so no per-page distribution
+    is rebuilt.
+
+    Return a rank vector summing to 1.
+    """
+    rng = np.random.default_rng(seed)
+    pages = len(graph)
+    offsets, targets = link_table(graph)
+    degree = graph.out_degree
+    surfers = max(1, min(surfers, n))
+
+    counts = np.zeros(pages, dtype=np.int64)
+    position = rng.integers(pages, size=surfers)
+    for _ in range(burn_in):
+        position = step(rng, position, offsets, targets, degree, damping_factor, pages)
+
+    taken = 0
+    while True:
+        batch = min(surfers, n - taken)
+        counts += np.bincount(position[:batch], minlength=pages)
+        taken += batch
+        if taken >= n:
+            break
+        position = step(rng, position, offsets, targets, degree, damping_factor, pages)
+
+    return counts / n
+
+
+def stationary_ranks(graph, damping_factor, tolerance=1e-14, max_iterations=10000):
+    """
+    Returns the stationary distribution of the `transition_model` chain
+    that `sample_ranks` samples from, by power iteration, and the number
+    of iterations taken. Unlike PageRank, a surfer that does not follow
+    a link picks among the page and its links rather than all pages, so
+    this, not `power_iteration`, is what the samplers estimate.
+    """
+    n = len(graph)
+    degree = graph.out_degree
+    linked = ~graph.dangling
+    ranks = np.full(n, 1 / n)
+    for iteration in range(1, max_iterations + 1):
+        # Each page's share of not following a link, spread over itself and its links
+        share = np.where(linked, (1 - damping_factor) * ranks / (degree + 1), 0)
+        new_ranks = (
+            damping_factor * (graph.matrix @ ranks)
+            + graph.matrix @ (share * degree) + share
+            + ranks[graph.dangling].sum() / n
+        )
+        new_ranks /= new_ranks.sum()
+        if np.abs(new_ranks - ranks).sum() < tolerance:
+            return new_ranks, iteration
+        ranks = new_ranks
+    return ranks, max_iterations
+
+
+def step(rng, position, offsets, targets, degree, damping_factor, pages):
+    """Moves every surfer in `position` one step and returns the new positions."""
+    if len(targets) == 0:
+        return rng.integers(pages, size=len(position))
+    k = degree[position]
+    follow = rng.random(len(position)) < damping_factor
+    choice = (rng.random(len(position)) * np.where(follow, k, k + 1)).astype(np.int64)
+
+    # Without following, choice 0 is the current page and choice j is link j - 1
+    stay = ~follow & (choice == 0)
+    link = np.where(follow, choice, choice - 1)
+    following = np.where(k > 0, offsets[position] + np.maximum(link, 0), 0)
+    new_position = np.where(stay, position, targets[np.minimum(following, len(targets) - 1)])
+
+    dangling = k == 0
+    new_position[dangling] = rng.integers(pages, size=int(dangling.sum()))
+    return new_position
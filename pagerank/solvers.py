@@ -0,0 +1,299 @@
+import sys
+import time
+
+import numpy as np
+import scipy.sparse
+import scipy.sparse.linalg
+
+# Fraction of the sliced rows in adaptive_iteration that must freeze before slicing
+# again, and how many iterations apart it checks
+REBUILD = 0.25
+FREEZE_CHECK = 4
+
+
+def power_iteration(graph, damping_factor, tolerance=1e-8, max_iterations=1000, start=None):
+    """
+    Compute PageRank for a LinkGraph with sparse matrix-vector products.
+
+    Dangling pages spread their rank evenly over every page, which is
+    applied as a rank-one correction rather than stored in the matrix.
+    Iterates from `start` (uniform by default) until the L1 change
+    between iterations falls below `tolerance`.
+
+    Return a tuple of (rank vector, iterations used).
+    """
+    n = len(graph)
+    matrix = graph.matrix
+    dangling = graph.dangling
+    ranks = np.full(n, 1 / n) if start is None else np.asarray(start, dtype=float)
+    teleport = (1 - damping_factor) / n
+
+    for iteration in range(1, max_iterations + 1):
+        new_ranks = damping_factor * (matrix @ ranks + ranks[dangling].sum() / n) + teleport
+        new_ranks /= new_ranks.sum()
+        delta = np.abs(new_ranks - ranks).sum()
+        ranks = new_ranks
+        if delta < tolerance:
+            break
+    return ranks, iteration
+
+
+def gauss_seidel(graph, damping_factor, tolerance=1e-8, max_iterations=1000, start=None):
+    """
+    Compute PageRank with Gauss-Seidel sweeps over (I - dM) x = b, so
+    each page's update already uses the new values of earlier pages.
+    A sweep is one sparse triangular solve; the dangling-page share in
+    b is taken from the previous sweep.
+
+    Return a tuple of (rank vector, sweeps used).
+    """
+    n = len(graph)
+    system = (scipy.sparse.identity(n, format="csr") - damping_factor * graph.matrix).tocsr()
+    lower = scipy.sparse.tril(system, format="csr")
+    upper = scipy.sparse.triu(system, k=1, format="csr")
+    dangling = graph.dangling
+    ranks = np.full(n, 1 / n) if start is None else np.asarray(start, dtype=float)
+
+    for iteration in range(1, max_iterations + 1):
+        b = np.full(n, (1 - damping_factor + damping_factor * ranks[dangling].sum()) / n)
+        new_ranks = scipy.sparse.linalg.spsolve_triangular(lower, b - upper @ ranks, lower=True)
+        new_ranks /= new_ranks.sum()
+        delta = np.abs(new_ranks - ranks).sum()
+        ranks = new_ranks
+        if delta < tolerance:
+            break
+    return ranks, iteration
+
+
+def aitken_extrapolation(graph, damping_factor, tolerance=1e-8, max_iterations=1000, start=None, every=10):
+    """
+    Power iteration that applies component-wise Aitken delta-squared
+    extrapolation to the last three iterates every `every` iterations.
+
+    Return a tuple of (rank vector, iterations used).
+    """
+    def extrapolate(history):
+        x0, x1, x2 = history
+        denominator = x2 - 2 * x1 + x0
+        safe = np.abs(denominator) > 1e-15
+        result = x2.copy()
+        result[safe] = x0[safe] - (x1[safe] - x0[safe]) ** 2 / denominator[safe]
+        return result
+
+    return extrapolated_iteration(graph, damping_factor, tolerance, max_iterations, start, every, 3, extrapolate)
+
+
+def quadratic_extrapolation(graph, damping_factor, tolerance=1e-8, max_iterations=1000, start=None, every=10):
+    """
+    Power iteration that applies quadratic extrapolation (Kamvar et al.)
+    to the last four iterates every `every` iterations, cancelling the
+    second and third eigenvector components of the error.
+
+    Return a tuple of (rank vector, iterations used).
+    """
+    def extrapolate(history):
+        x0, x1, x2, x3 = history
+        y = np.column_stack((x1 - x0, x2 - x0))
+        gamma, *_ = np.linalg.lstsq(y, -(x3 - x0), rcond=None)
+        gamma1, gamma2, gamma3 = gamma[0], gamma[1], 1
+        return (gamma1 + gamma2 + gamma3) * x1 + (gamma2 + gamma3) * x2 + gamma3 * x3
+
+    return extrapolated_iteration(graph, damping_factor, tolerance, max_iterations, start, every, 4, extrapolate)
+
+
+def extrapolated_iteration(graph, damping_factor, tolerance, max_iterations, start, every, window, extrapolate):
+    """
+    Power iteration that replaces the current iterate with
+    `extrapolate(last `window` iterates)` every `every` iterations.
+    """
+    n = len(graph)
+    ranks = np.full(n, 1 / n) if start is None else np.asarray(start, dtype=float)
+    history = [ranks]
+
+    for iteration in range(1, max_iterations + 1):
+        new_ranks = step(graph, damping_factor, ranks)
+        history = (history + [new_ranks])[-window:]
+        if iteration % every == 0 and len(history) == window:
+            new_ranks = np.abs(extrapolate(history))
+            new_ranks /= new_ranks.sum()
+            history = [new_ranks]
+        delta = np.abs(new_ranks - ranks).sum()
+        ranks = new_ranks
+        if delta < tolerance:
+            break
+    return ranks, iteration
+
+
+def adaptive_iteration(graph, damping_factor, tolerance=1e-8, max_iterations=1000, start=None, freeze=None,
+                       rebuild=REBUILD):
+    """
+    Power iteration that stops recomputing pages once their value
+    changes by less than `freeze` relative to itself (Kamvar et al.),
+    so later iterations only multiply the rows of pages still moving.
+
+    A frozen page keeps the error it had when it froze, so `freeze`
+    defaults to a small fraction of `tolerance`, which keeps the final
+    L1 error within `tolerance`. Slicing out the rows of moving pages
+    costs about as much as a full product, so pages are only frozen
+    once more than a `rebuild` fraction of the rows being multiplied
+    are below `freeze`, checked every FREEZE_CHECK iterations; until
+    then every row is updated as usual.
+
+    With the default `freeze`, few pages settle before the whole vector
+    converges, so this runs about as fast as `power_iteration`. Larger
+    values of `freeze` trade accuracy for speed.
+
+    Return a tuple of (rank vector, iterations used).
+    """
+    n = len(graph)
+    matrix = graph.matrix
+    dangling = graph.dangling
+    ranks = np.full(n, 1 / n) if start is None else np.asarray(start, dtype=float)
+    teleport = (1 - damping_factor) / n
+    freeze = tolerance * (1 - damping_factor) / 10 if freeze is None else freeze
+    # Pages still being recomputed and their rows, or None while that is every page
+    active = None
+    rows = matrix
+
+    for iteration in range(1, max_iterations + 1):
+        values = damping_factor * (rows @ ranks + ranks[dangling].sum() / n) + teleport
+        previous = ranks if active is None else ranks[active]
+        if active is None:
+            new_ranks = values
+        else:
+            new_ranks = ranks.copy()
+            new_ranks[active] = values
+        new_ranks /= new_ranks.sum()
+        delta = np.abs(new_ranks - ranks).sum()
+        ranks = new_ranks
+        if delta < tolerance:
+            break
+
+        # Checking for frozen pages is a pass over every row, so only do it every few iterations
+        if iteration % FREEZE_CHECK == 0:
+            moving = np.abs(values - previous) > freeze * values
+            if len(moving) - np.count_nonzero(moving) > rebuild * len(moving):
+                active = np.flatnonzero(moving) if active is None else active[moving]
+                rows = matrix[active]
+    return ranks, iteration
+
+
+def personalized_iteration(graph, damping_factor, teleports, tolerance=1e-8, max_iterations=1000):
+    """
+    Compute one PageRank vector per column of the (pages x k) matrix
+    `teleports`, iterating all of them together as a single sparse
+    matrix-dense matrix product. Each column must sum to 1; teleporting
+    surfers, and surfers on dangling pages, jump according to it.
+
+    Teleport vectors are applied from their nonzero entries only, and a
+    column leaves the batch as soon as its L1 change is below
+    `tolerance`.
+
+    Return a tuple of (pages x k rank matrix, iterations used).
+    """
+    teleports = np.asarray(teleports, dtype=float)
+    matrix = graph.matrix
+    dangling = graph.dangling
+    rows, columns = np.nonzero(teleports)
+    weights = teleports[rows, columns]
+    ranks = teleports.copy()
+    result = np.empty_like(ranks)
+    active = np.arange(teleports.shape[1])
+
+    for iteration in range(1, max_iterations + 1):
+        # Dangling rank and random jumps both follow the teleport vectors
+        jump = damping_factor * ranks[dangling].sum(axis=0) + 1 - damping_factor
+        new_ranks = matrix @ ranks
+        new_ranks *= damping_factor
+        new_ranks[rows, columns] += weights * jump[columns]
+
+        # Reuse the old ranks as scratch space for the change
+        np.subtract(new_ranks, ranks, out=ranks)
+        np.abs(ranks, out=ranks)
+        converged = ranks.sum(axis=0) < tolerance
+        ranks = new_ranks
+
+        if converged.any():
+            result[:, active[converged]] = ranks[:, converged]
+            remaining = ~converged
+            position = np.cumsum(remaining) - 1
+            entries = remaining[columns]
+            rows, columns, weights = rows[entries], position[columns[entries]], weights[entries]
+            active = active[remaining]
+            ranks = np.ascontiguousarray(ranks[:, remaining])
+            if not len(active):
+                break
+
+    result[:, active] = ranks
+    return result / result.sum(axis=0), iteration
+
+
+def step(graph, damping_factor, ranks):
+    """Returns one normalized power iteration step from `ranks`."""
+    n = len(graph)
+    new_ranks = damping_factor * (graph.matrix @ ranks + ranks[graph.dangling].sum() / n)
+    new_ranks += (1 - damping_factor) / n
+    return new_ranks / new_ranks.sum()
+
+
+SOLVERS = {
+    "sparse": power_iteration,
+    "gauss-seidel": gauss_seidel,
+    "aitken": aitken_extrapolation,
+    "quadratic": quadratic_extrapolation,
+    "adaptive": adaptive_iteration,
+}
+
+
+def main():
+    if len(sys.argv) not in (2, 3):
+        sys.exit("Usage: python solvers.py corpus [tolerance]")
+    tolerance = float(sys.argv[2]) if len(sys.argv) == 3 else 1e-8
+
+    from pagerank import DAMPING, link_graph, load_corpus
+    graph = link_graph(load_corpus(sys.argv[1]))
+    graph.matrix  # build the link matrix before timing
+    reference, _ = power_iteration(graph, DAMPING, 1e-14, 10000)
+
+    print(f"Solvers on {len(graph)} pages, {len(graph.src)} links, L1 tolerance {tolerance}:")
+    for name, solver in SOLVERS.items():
+        start = time.perf_counter()
+        ranks, iterations = solver(graph, DAMPING, tolerance)
+        elapsed = time.perf_counter() - start
+        error = np.abs(ranks - reference).sum()
+        print(f"  {name:>12}: {iterations:5} iterations, {elapsed:8.3f}s, L1 error {error:.2e}")
+
+    compare_personalized(graph, DAMPING, tolerance)
+
+
+def compare_personalized(graph, damping_factor, tolerance, vectors=32, seeds=5):
+    """
+    Times `vectors` personalized PageRank runs, each teleporting to
+    `seeds` random pages, batched together and one at a time.
+    """
+    rng = np.random.default_rng(0)
+    n = len(graph)
+    teleports = np.zeros((n, vectors))
+    for column in range(vectors):
+        teleports[rng.choice(n, size=min(seeds, n), replace=False), column] = 1
+    teleports /= teleports.sum(axis=0)
+
+    start = time.perf_counter()
+    batched, iterations = personalized_iteration(graph, damping_factor, teleports, tolerance)
+    batched_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    sequential = np.column_stack([
+        personalized_iteration(graph, damping_factor, teleports[:, [column]], tolerance)[0][:, 0]
+        for column in range(vectors)
+    ])
+    sequential_time = time.perf_counter() - start
+
+    difference = np.abs(batched - sequential).sum(axis=0).max()
+    print(f"Personalized PageRank for {vectors} seed sets of {seeds} pages:")
+    print(f"  batched: {batched_time:.3f}s ({iterations} iterations), "
+          f"sequential: {sequential_time:.3f}s, max L1 difference {difference:.2e}")
+
+
+if __name__ == "__main__":
+    main()
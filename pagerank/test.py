@@ -0,0 +1,56 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+import incremental
+import pagerank
+
+CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "corpus0")
+
+
+class TestIncremental(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.corpus = os.path.join(self.directory, "corpus")
+        shutil.copytree(CORPUS, self.corpus)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def assertMatchesCold(self, state):
+        cold, _ = incremental.update(self.corpus, None, workers=1)
+        self.assertEqual(
+            sorted(zip(state.src.tolist(), state.dst.tolist())),
+            sorted(zip(cold.src.tolist(), cold.dst.tolist())),
+        )
+        self.assertTrue(np.allclose(state.ranks, cold.ranks, atol=1e-6))
+
+    def test_remove_and_restore(self):
+        page = os.path.join(self.corpus, "2.html")
+        kept = os.path.join(self.directory, "2.html")
+        state, _ = incremental.update(self.corpus, None, workers=1)
+
+        shutil.move(page, kept)
+        state, _ = incremental.update(self.corpus, state, workers=1)
+        self.assertMatchesCold(state)
+
+        shutil.move(kept, page)
+        state, _ = incremental.update(self.corpus, state, workers=1)
+        self.assertMatchesCold(state)
+
+
+class TestPersonalized(unittest.TestCase):
+
+    def test_invalid_teleports(self):
+        corpus = pagerank.crawl(CORPUS)
+        for teleport in [[], {"1.html": 0}, ["missing.html"], {"1.html": -1, "2.html": 2}]:
+            with self.assertRaises(ValueError):
+                pagerank.personalized_pagerank(corpus, pagerank.DAMPING, [["1.html"], teleport])
+
+
+if __name__ == "__main__":
+    unittest.main()